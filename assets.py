@@ -0,0 +1,21 @@
+import os
+
+from support import import_folder_dict
+
+
+class AssetCache:
+    # Images decoded once per folder with import_folder_dict and shared by everything that draws
+    # them. Folders load on first use, after the display is set up, as convert_alpha needs it.
+    # The surfaces are shared, so copy one before drawing on it or changing its alpha.
+    def __init__(self):
+        self.folders = {}
+
+    def load(self, path):
+        # path as it would be given to pygame.image.load, e.g. 'graphics/wall.png'
+        folder, file_name = os.path.split(path)
+        if folder not in self.folders:
+            self.folders[folder] = import_folder_dict(folder)
+        return self.folders[folder][file_name.split('.')[0]]
+
+
+assets = AssetCache()
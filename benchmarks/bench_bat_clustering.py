@@ -0,0 +1,28 @@
+# BatAlgorithmClustering run time for large table counts.
+# Run from the repository root: python -m benchmarks.bench_bat_clustering
+import time
+
+import numpy as np
+
+from planning.clustering import BatAlgorithmClustering
+
+SEED = 7
+CASES = ((200, 10), (1000, 50), (5000, 50))
+
+
+def main():
+    print(f"{'tables':>7} {'robots':>7} {'run s':>8} {'fitness':>12}")
+    for n_tables, n_robots in CASES:
+        np.random.seed(SEED)
+        tables = np.random.randint(0, 500, size=(n_tables, 2))
+
+        started = time.perf_counter()
+        clustering = BatAlgorithmClustering(tables, n_robots)
+        clustering.run()
+        elapsed = time.perf_counter() - started
+
+        print(f"{n_tables:>7} {n_robots:>7} {elapsed:>8.3f} {clustering.best_fitness:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
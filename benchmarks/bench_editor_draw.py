@@ -0,0 +1,48 @@
+# Editor.run time per frame with growing square maps loaded into the editor: walls on a
+# quarter of the cells, a table on every 25th cell and ROBOTS robots.
+# Run from the repository root: python -m benchmarks.bench_editor_draw [size ...]
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from editor import Editor
+from settings import *
+
+SEED = 7
+ROBOTS = 10
+FRAMES = 60
+
+
+def random_save(size, rng):
+    grid = (rng.random((size, size)) >= 0.25).astype(int)
+    free = np.argwhere(grid == 1)
+    robots = free[rng.choice(len(free), ROBOTS, replace=False)]
+    tables = np.argwhere(grid == 0)[::25]
+    return grid.tolist(), [[int(col), int(row)] for row, col in robots], tables.tolist()
+
+
+def main(sizes):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'size':>6} {'tiles':>7} {'ms/frame':>9}")
+    for size in sizes:
+        editor = Editor(lambda *args, **kwargs: None)
+        editor.load(*random_save(size, rng))
+        editor.run(1 / FPS)
+
+        started = time.perf_counter()
+        for _ in range(FRAMES):
+            editor.run(1 / FPS)
+        frame_time = (time.perf_counter() - started) / FRAMES * 1000
+        print(f"{size:>6} {len(editor.canvas_data):>7} {frame_time:>9.3f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10, 100, 400])
@@ -0,0 +1,52 @@
+# Fleet.update time per frame for growing numbers of robots following random walks.
+# Run from the repository root: python -m benchmarks.bench_fleet [robots ...]
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from fleet import Fleet
+from robot import Robot
+from settings import *
+from spatial import SpatialHash
+
+SEED = 7
+STEPS = 200
+FRAMES = 120
+
+
+def random_walk(start, rng):
+    moves = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)])
+    walk = np.cumsum(moves[rng.integers(0, len(moves), STEPS)], axis=0) + start
+    return np.concatenate([[start], walk]).astype(np.int32)
+
+
+def main(robot_counts):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'robots':>7} {'ms/frame':>9} {'fps budget used':>16}")
+    for count in robot_counts:
+        robots = []
+        for i in range(count):
+            start = (i % 50 * 10, i // 50 * 10)
+            robot = Robot((start[0] * TILE_SIZE, start[1] * TILE_SIZE), (), SpatialHash())
+            robot.set_path(random_walk(start, rng))
+            robots.append(robot)
+
+        fleet = Fleet(robots)
+        fleet.start(pygame.time.get_ticks())
+        started = time.perf_counter()
+        for _ in range(FRAMES):
+            fleet.update(1 / FPS)
+        frame_time = (time.perf_counter() - started) / FRAMES * 1000
+        print(f"{count:>7} {frame_time:>9.3f} {frame_time / (1000 / FPS):>15.0%}")
+
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [10, 100, 500, 1000])
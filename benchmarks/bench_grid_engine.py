@@ -0,0 +1,50 @@
+# Native GridEngine against the pathfinding finders on random warehouse-like maps.
+# Run from the repository root: python -m benchmarks.bench_grid_engine [size ...]
+import sys
+import time
+
+import numpy as np
+
+from planning.search import get_search
+
+SEED = 7
+QUERIES = 5
+
+
+def random_grid(size, rng, wall_ratio=0.2):
+    grid = (rng.random((size, size)) >= wall_ratio).astype(int)
+    return grid.tolist()
+
+
+def random_free_cells(grid, count, rng):
+    free = np.argwhere(np.asarray(grid) != 0)
+    return [tuple(int(value) for value in free[i]) for i in rng.choice(len(free), count)]
+
+
+def time_backend(grid, queries, finder, backend):
+    # construction is timed too, the pathfinding backend builds its node graph there
+    started = time.perf_counter()
+    search = get_search(grid, finder, backend)
+    lengths = [len(search.find_path(start, end)) for start, end in queries]
+    return time.perf_counter() - started, lengths
+
+
+def main(sizes):
+    rng = np.random.default_rng(SEED)
+    print(f"{'size':>6} {'finder':>9} {'pathfinding s':>14} {'native s':>9} {'speed-up':>9}")
+    for size in sizes:
+        grid = random_grid(size, rng)
+        cells = random_free_cells(grid, 2 * QUERIES, rng)
+        queries = list(zip(cells[::2], cells[1::2]))
+
+        native_time, native_lengths = time_backend(grid, queries, 'bfs', 'native')
+        for finder in ('bfs', 'dijkstra', 'astar'):
+            reference_time, reference_lengths = time_backend(grid, queries, finder, 'pathfinding')
+            if reference_lengths != native_lengths:
+                print(f"path lengths differ for {finder}: {reference_lengths} != {native_lengths}")
+            print(f"{size:>6} {finder:>9} {reference_time:>14.3f} {native_time:>9.3f} "
+                  f"{reference_time / native_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [50, 200, 500])
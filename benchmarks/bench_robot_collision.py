@@ -0,0 +1,78 @@
+# Robot movement and collision time per frame against the number of walls, with the obstacle
+# SpatialHash and with a plain scan over every obstacle as Robot.collision used to do.
+# Run from the repository root: python -m benchmarks.bench_robot_collision [walls ...]
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from node import Node
+from robot import Robot
+from settings import *
+from spatial import SpatialHash
+
+SEED = 7
+ROBOTS = 50
+FRAMES = 60
+
+
+class FullScan:
+    # the old behaviour: every obstacle is checked against every hitbox
+    def __init__(self, sprites):
+        self.sprites = sprites
+
+    def query(self, rect):
+        return self.sprites
+
+
+def build(walls, rng):
+    # walls scattered over a square map, robots on free cells driving right
+    side = int(np.ceil(np.sqrt(walls * 2)))
+    cells = rng.permutation(side * side)
+    wall_surf = pygame.Surface((TILE_SIZE, TILE_SIZE))
+
+    obstacles = [Node((cell % side * TILE_SIZE, cell // side * TILE_SIZE), wall_surf, ())
+                 for cell in cells[:walls]]
+    robots = [Robot((cell % side * TILE_SIZE, cell // side * TILE_SIZE), (), None)
+              for cell in cells[walls:walls + ROBOTS]]
+    return obstacles, robots
+
+
+def time_frames(robots, index):
+    for robot in robots:
+        robot.obstacles = index
+        robot.update_position()
+
+    direction = pygame.math.Vector2(1, 0)
+    started = time.perf_counter()
+    for _ in range(FRAMES):
+        for robot in robots:
+            robot.drive(direction, 1 / FPS)
+    return (time.perf_counter() - started) / FRAMES * 1000, [robot.hitbox.topleft for robot in robots]
+
+
+def main(wall_counts):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'walls':>7} {'robots':>7} {'scan ms/frame':>14} {'hash ms/frame':>14} {'speed-up':>9}")
+    for walls in wall_counts:
+        obstacles, robots = build(walls, rng)
+        index = SpatialHash()
+        for obstacle in obstacles:
+            index.add(obstacle)
+
+        scan_time, scan_positions = time_frames(robots, FullScan(obstacles))
+        hash_time, hash_positions = time_frames(robots, index)
+        if scan_positions != hash_positions:
+            print(f"robot positions differ with {walls} walls")
+        print(f"{walls:>7} {ROBOTS:>7} {scan_time:>14.3f} {hash_time:>14.3f} {scan_time / hash_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(walls) for walls in sys.argv[1:]] or [100, 1000, 5000])
@@ -0,0 +1,174 @@
+# Every algorithm Layout.choose_algorithm_popup offers, planned headless on every map in saves/ (JSON or .map)
+# with fixed seeds. For each pair it records the best wall time of REPEATS runs, the peak traced
+# memory, the total path length and the nodes expanded (wavefront cells settled, pathfinding finder
+# iterations and space-time A* / conflict tree states popped), writes them as JSON and compares
+# them with a stored baseline, flagging regressions. Planning runs in this process (workers=1).
+# Run from the repository root:
+#   python -m benchmarks.bench_saves [save ...] [--out FILE] [--baseline FILE] [--update-baseline]
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+import planning.cbs
+import planning.reservation
+from mapfile import load_map
+from planning import algorithm_options, plan_paths
+from planning.engine import GridEngine
+from planning.search import PathfindingSearch
+
+SEED = 7
+REPEATS = 3
+SAVES = Path('saves')
+BASELINE = Path(__file__).with_name('baseline_saves.json')
+# how much worse than the baseline a measurement may get before it is flagged;
+# time gets an absolute allowance too, the small saves plan in a few milliseconds
+TIME_TOLERANCE = 1.5
+TIME_SLACK = 0.02
+MEMORY_TOLERANCE = 1.25
+NODES_TOLERANCE = 1.1
+
+
+class ExpansionCounter:
+    # counts search work while active by wrapping the searches the planners use
+    def __init__(self):
+        self.nodes = 0
+
+    def __enter__(self):
+        expand = GridEngine.expand
+        find_path = PathfindingSearch.find_path
+
+        def counted_expand(engine, source, goals=None):
+            expand(engine, source, goals)
+            self.nodes += int((engine.distance != -1).sum())
+
+        def counted_find_path(search, start, end):
+            path = find_path(search, start, end)
+            self.nodes += search.finder.runs
+            return path
+
+        def counted_heappop(heap):
+            self.nodes += 1
+            return heapq.heappop(heap)
+
+        counted_heapq = SimpleNamespace(heappush=heapq.heappush, heappop=counted_heappop)
+        self.restore = [(GridEngine, 'expand', expand), (PathfindingSearch, 'find_path', find_path),
+                        (planning.reservation, 'heapq', heapq), (planning.cbs, 'heapq', heapq)]
+        GridEngine.expand = counted_expand
+        PathfindingSearch.find_path = counted_find_path
+        planning.reservation.heapq = counted_heapq
+        planning.cbs.heapq = counted_heapq
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, value in self.restore:
+            setattr(owner, name, value)
+
+
+def plan(data, algorithm):
+    # the planners print their progress, which would bury the table
+    np.random.seed(SEED)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return plan_paths(algorithm, data['grid'].tolist(), data['start'].tolist(), data['end'].tolist(), workers=1)
+
+
+def measure(data, algorithm):
+    try:
+        times = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            plan(data, algorithm)
+            times.append(time.perf_counter() - started)
+
+        # memory and nodes come from one more run, tracemalloc slows the timed ones down
+        tracemalloc.start()
+        with ExpansionCounter() as counter:
+            paths = plan(data, algorithm)
+        _, peak = tracemalloc.get_traced_memory()
+    except ValueError as e:
+        return {'error': str(e)}
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time': min(times),
+        'memory': peak,
+        'length': sum(len(path) for path in paths if path is not None),
+        'nodes': counter.nodes,
+    }
+
+
+def regressions(result, baseline):
+    found = []
+    if 'error' in result or 'error' in baseline:
+        if result.get('error') != baseline.get('error'):
+            found.append(f"error {baseline.get('error')!r} -> {result.get('error')!r}")
+        return found
+
+    if result['time'] > baseline['time'] * TIME_TOLERANCE + TIME_SLACK:
+        found.append(f"time {baseline['time']:.4f}s -> {result['time']:.4f}s")
+    if result['memory'] > baseline['memory'] * MEMORY_TOLERANCE:
+        found.append(f"memory {baseline['memory']} -> {result['memory']} bytes")
+    if result['length'] > baseline['length']:
+        found.append(f"path length {baseline['length']} -> {result['length']}")
+    if result['nodes'] > baseline['nodes'] * NODES_TOLERANCE:
+        found.append(f"nodes {baseline['nodes']} -> {result['nodes']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('saves', nargs='*', help="save names, every file in saves/ by default")
+    parser.add_argument('--out', type=Path, help="where to write the results as JSON")
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="store these results as the baseline")
+    args = parser.parse_args()
+
+    paths = [SAVES / name for name in args.saves] or sorted(path for path in SAVES.iterdir()
+                                                             if path.suffix in ('.txt', '.map'))
+    results = {}
+    print(f"{'save':<28} {'algorithm':<18} {'time s':>8} {'peak KiB':>9} {'length':>7} {'nodes':>8}")
+    for path in paths:
+        data = load_map(path)
+        for _, algorithm in algorithm_options(len(data['start']), len(data['end'])):
+            result = measure(data, algorithm)
+            results[f"{path.name}: {algorithm}"] = result
+            if 'error' in result:
+                print(f"{path.name:<28} {algorithm:<18} {result['error']}")
+            else:
+                print(f"{path.name:<28} {algorithm:<18} {result['time']:>8.4f} {result['memory'] / 1024:>9.1f} "
+                      f"{result['length']:>7} {result['nodes']:>8}")
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --update-baseline to store one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    flagged = 0
+    for key, result in results.items():
+        if key not in baseline:
+            print(f"{key}: not in the baseline")
+            continue
+        for regression in regressions(result, baseline[key]):
+            print(f"REGRESSION {key}: {regression}")
+            flagged += 1
+    print(f"{flagged} regression(s) against {args.baseline}")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import json
+import math
 import os
 import os.path
 import sys
@@ -6,25 +7,34 @@ import tkinter as tk
 from pathlib import Path
 from tkinter import messagebox
 
-from pygame.image import load
+import numpy as np
 from pygame.math import Vector2 as vector
 from pygame.mouse import get_pos as mouse_pos
 from pygame.mouse import get_pressed as mouse_buttons
 
+from assets import assets
+from mapfile import load_map, save_map
 from menu import Menu
 from settings import *
 from support import *
+from tilemap import TileMap
 from timer import *
 
 
+# tile ids by style, looked up once instead of per tile
+TERRAIN_IDS = [key for key, value in EDITOR_DATA.items() if value['style'] == 'terrain']
+OBSTACLE_IDS = [key for key, value in EDITOR_DATA.items() if value['style'] == 'obstacle']
+ROBOT_IDS = [key for key, value in EDITOR_DATA.items() if value['style'] == 'robot']
+
+
 def get_save_files():
-    return [f for f in os.listdir('saves') if os.path.isfile(os.path.join('saves', f)) and f.endswith('.txt')]
+    return [f for f in os.listdir('saves') if os.path.isfile(os.path.join('saves', f)) and f.endswith(('.txt', '.map'))]
 
 
 class Editor:
     def __init__(self, switch):
         self.display_surface = pygame.display.get_surface()
-        self.canvas_data = {}
+        self.canvas_data = TileMap()
         self.imports()
         self.switch = switch
         self.disable = False
@@ -37,6 +47,15 @@ class Editor:
         self.support_line_surf.set_colorkey("green")
         self.support_line_surf.set_alpha(30)
 
+        # the grey background, tiles and grid lines as seen from canvas_origin; until the origin
+        # moves only the cells in dirty_cells are redrawn on it. overlay_rects are where the
+        # robots, preview and menu were drawn over it last frame, wiped from the display next frame
+        self.canvas_surf = pygame.Surface((WIDTH, HEIGHT))
+        self.canvas_origin = None
+        self.dirty_cells = set()
+        self.overlay_rects = []
+        self.full_redraw = True
+
         self.selection_index = 2
         self.previous_index = None
 
@@ -74,7 +93,7 @@ class Editor:
                     'frames': graphics,
                     'length': len(graphics)
                 }
-        self.preview_surfs = {key: load(value['preview']) for key, value in EDITOR_DATA.items() if
+        self.preview_surfs = {key: assets.load(value['preview']) for key, value in EDITOR_DATA.items() if
                               value['preview']}
 
     def animation_update(self, dt):
@@ -90,17 +109,11 @@ class Editor:
 
     def create_grid(self, save=False):
         try:
-            for tile in self.canvas_data.values():
-                tile.objects = []
-
+            robots = []
             for obj in self.canvas_objects:
                 current_cell = self.get_current_cell(obj)
                 offset = vector(obj.distance_to_origin) - (vector(current_cell) * TILE_SIZE)
-
-                if current_cell in self.canvas_data:
-                    self.canvas_data[current_cell].add_id(obj.tile_id, offset)
-                else:
-                    self.canvas_data[current_cell] = CanvasTile(obj.tile_id, offset)
+                robots.append((current_cell, obj.tile_id, offset))
 
             layers = {
                 'wall': {},
@@ -108,7 +121,7 @@ class Editor:
                 'robot': {},
             }
 
-            if self.canvas_data == {}:
+            if not self.canvas_data and not robots:
                 raise ValueError("Nothing found.")
 
         except Exception as e:
@@ -119,35 +132,35 @@ class Editor:
             return
         else:
             try:
-                left = sorted(self.canvas_data.keys(), key=lambda t: t[0])[0][0]
-                right = sorted(self.canvas_data.keys(), key=lambda t: t[0], reverse=True)[0][0]
-                top = sorted(self.canvas_data.keys(), key=lambda t: t[1])[0][1]
-                bottom = sorted(self.canvas_data.keys(), key=lambda t: t[1], reverse=True)[0][1]
-
-                grid = [[1 for _ in range(right - left + 1)] for _ in range(bottom - top + 1)]
+                # the map spans every painted tile and every robot
+                bounds = [self.canvas_data.get_bounds()] if self.canvas_data else []
+                bounds += [(cell[0], cell[1], cell[0], cell[1]) for cell, _, _ in robots]
+                left = min(bound[0] for bound in bounds)
+                top = min(bound[1] for bound in bounds)
+                right = max(bound[2] for bound in bounds)
+                bottom = max(bound[3] for bound in bounds)
+
+                tile_ids = self.canvas_data.to_array(left, top, right, bottom)
+                walls = np.isin(tile_ids, TERRAIN_IDS)
+                obstacles = np.isin(tile_ids, OBSTACLE_IDS)
+
+                grid = np.where(walls | obstacles, 0, 1).tolist()
                 start_coords = []
                 end_coords = []
 
-                for tile_pos, tile in self.canvas_data.items():
-                    row_adjusted = tile_pos[1] - top
-                    col_adjusted = tile_pos[0] - left
-                    x = col_adjusted * TILE_SIZE
-                    y = row_adjusted * TILE_SIZE
-
-                    if tile.has_wall:
-                        layers['wall'][(x, y)] = tile.has_wall
-                        grid[row_adjusted][col_adjusted] = 0
+                for row_adjusted, col_adjusted in np.argwhere(walls).tolist():
+                    layers['wall'][(col_adjusted * TILE_SIZE, row_adjusted * TILE_SIZE)] = True
 
-                    if tile.has_obstacle:
-                        layers['obstacle'][(x, y)] = tile.has_obstacle
-                        end_coords.append((row_adjusted, col_adjusted))
-                        grid[row_adjusted][col_adjusted] = 0
+                for row_adjusted, col_adjusted in np.argwhere(obstacles).tolist():
+                    layers['obstacle'][(col_adjusted * TILE_SIZE, row_adjusted * TILE_SIZE)] = True
+                    end_coords.append((row_adjusted, col_adjusted))
 
-                    if tile.objects:
-                        for obj, offset in tile.objects:
-                            if obj in [key for key, value in EDITOR_DATA.items() if value['style'] == 'robot']:  # robot
-                                layers['robot'][(int(x + offset.x), int(y + offset.y))] = obj
-                                start_coords.append((int((x + offset.x) / TILE_SIZE), int((y + offset.y) / TILE_SIZE)))
+                for cell, obj, offset in robots:
+                    if obj in ROBOT_IDS:
+                        x = (cell[0] - left) * TILE_SIZE
+                        y = (cell[1] - top) * TILE_SIZE
+                        layers['robot'][(int(x + offset.x), int(y + offset.y))] = obj
+                        start_coords.append((int((x + offset.x) / TILE_SIZE), int((y + offset.y) / TILE_SIZE)))
 
                 if not start_coords and not end_coords:
                     raise ValueError("No Robots or Tables found.")
@@ -164,8 +177,11 @@ class Editor:
             else:
                 if save:
                     base = Path('saves')
-                    jsonpath = base / (save + ".txt")
                     base.mkdir(exist_ok=True)
+                    if SAVE_FORMAT == 'binary':
+                        save_map(base / (save + ".map"), grid, start_coords, end_coords)
+                        return
+                    jsonpath = base / (save + ".txt")
                     data = {
                         "grid": grid,
                         "start": start_coords,
@@ -239,6 +255,8 @@ class Editor:
 
     def get_filename_popup(self):
         self.disable = True
+        # the popup draws over the whole screen
+        self.full_redraw = True
         input_active = True
         filename = ""
         error_message = ""
@@ -300,9 +318,9 @@ class Editor:
             if filename.strip() != "" and error_message_real_time:
                 error_message = ""
 
-            self.display_surface.fill("grey")
             self.draw_level()
-            self.draw_tile_lines()
+            self.display_surface.blit(self.canvas_surf, (0, 0))
+            self.canvas_objects.draw(self.display_surface)
             self.preview()
             pygame.draw.rect(self.display_surface, bg_color, popup_rect)
             pygame.draw.rect(self.display_surface, text_color, popup_rect, 2)
@@ -334,6 +352,8 @@ class Editor:
 
     def show_dropdown_menu(self, options):
         self.disable = True
+        # the popup draws over the whole screen
+        self.full_redraw = True
         input_active = True
         selected_option = None
 
@@ -378,9 +398,9 @@ class Editor:
                             input_active = False
                             break
 
-            self.display_surface.fill("grey")
             self.draw_level()
-            self.draw_tile_lines()
+            self.display_surface.blit(self.canvas_surf, (0, 0))
+            self.canvas_objects.draw(self.display_surface)
             self.preview()
             pygame.draw.rect(self.display_surface, bg_color, popup_rect)
             pygame.draw.rect(self.display_surface, text_color, popup_rect, 2)
@@ -422,9 +442,15 @@ class Editor:
                     if selected_file:
                         self.clear()
                         self.disable = False
-                        with open(f'saves/{selected_file}') as load_file:
-                            data = json.load(load_file)
-                        self.load(data['grid'], data['start'], data['end'])
+                        try:
+                            data = load_map(f'saves/{selected_file}')
+                        except ValueError as e:
+                            print(f"An error occurred: {str(e)}")
+                            root = tk.Tk()
+                            root.withdraw()
+                            messagebox.showerror("Error", str(e))
+                        else:
+                            self.load(data['grid'], data['start'], data['end'])
             elif new_index == 7 and not self.menu.collapse_top_menu:
                 self.clear()
             elif new_index == 8 and not self.menu.collapse_top_menu:
@@ -444,16 +470,18 @@ class Editor:
                 origin=self.origin,
                 group=self.canvas_objects)
 
-        for row, _ in enumerate(grid):
-            for col, _ in enumerate(grid[row]):
-                if grid[row][col] == 0 and [row, col] not in end_coords:
-                    self.canvas_data[(col, row)] = CanvasTile(2)
-                elif grid[row][col] == 0 and [row, col] in end_coords:
-                    self.canvas_data[(col, row)] = CanvasTile(3)
+        # blocked cells become walls, or tables where they are end coordinates
+        tile_ids = np.where(np.asarray(grid) == 0, 2, 0).astype(np.uint8)
+        if len(end_coords):
+            ends = np.asarray(end_coords).reshape(-1, 2)
+            tile_ids[ends[:, 0], ends[:, 1]] = np.where(tile_ids[ends[:, 0], ends[:, 1]], 3, 0)
+        self.canvas_data.paste(tile_ids)
+        self.canvas_origin = None
 
     def clear(self):
         self.canvas_objects.empty()
         self.canvas_data.clear()
+        self.canvas_origin = None
 
     def canvas_add(self):
         if mouse_buttons()[0] and not self.menu.rect_bottom.collidepoint(mouse_pos()) \
@@ -462,7 +490,8 @@ class Editor:
             current_cell = self.get_current_cell()
             if EDITOR_DATA[self.selection_index]['type'] == 'tile':
                 if current_cell not in self.canvas_data:
-                    self.canvas_data[current_cell] = CanvasTile(self.selection_index)
+                    self.canvas_data.set(current_cell, self.selection_index)
+                    self.dirty_cells.add(current_cell)
 
             else:  # objects
                 if not self.object_timer.active:
@@ -485,10 +514,8 @@ class Editor:
             if self.canvas_data:
                 current_cell = self.get_current_cell()
                 if current_cell in self.canvas_data:
-                    self.canvas_data[current_cell].remove_id(self.selection_index)
-
-                    if self.canvas_data[current_cell].is_empty:
-                        del self.canvas_data[current_cell]
+                    self.canvas_data.remove(current_cell, self.selection_index)
+                    self.dirty_cells.add(current_cell)
 
     def object_drag(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and mouse_buttons()[0]:
@@ -520,24 +547,57 @@ class Editor:
             y = origin_offset.y + row * TILE_SIZE
             pygame.draw.line(self.support_line_surf, "black", (0, y), (WIDTH, y))
 
-        self.display_surface.blit(self.support_line_surf, (0, 0))
-
-    def draw_level(self):
-        for cell_pos, tile in self.canvas_data.items():
-            pos = self.origin + vector(cell_pos) * TILE_SIZE
+    def cell_rect(self, cell):
+        pos = self.origin + vector(cell) * TILE_SIZE
+        return pygame.Rect(int(pos.x), int(pos.y), TILE_SIZE, TILE_SIZE)
 
-            if tile.has_wall:
-                image = pygame.image.load('graphics/wall.png').convert_alpha()
-                self.display_surface.blit(image, pos)
+    def visible_cells(self):
+        # (left, top, right, bottom) cells on screen, inclusive
+        return (math.floor(-self.origin.x / TILE_SIZE), math.floor(-self.origin.y / TILE_SIZE),
+                math.floor((WIDTH - self.origin.x) / TILE_SIZE), math.floor((HEIGHT - self.origin.y) / TILE_SIZE))
 
-            if tile.has_obstacle:
-                image = pygame.image.load('graphics/table.png').convert_alpha()
-                self.display_surface.blit(image, pos)
+    def draw_tile(self, cell, tile_id):
+        self.canvas_surf.blit(assets.load(EDITOR_DATA[tile_id]['preview']), self.cell_rect(cell).topleft)
 
-            if tile.robot:
-                image = pygame.image.load('graphics/robot_player.png').convert_alpha()
-                self.display_surface.blit(image, pos)
+    def draw_level(self):
+        # brings canvas_surf up to date, returning the screen rects that changed on it. Moving the
+        # origin redraws the cells on screen and the grid lines, otherwise only dirty cells change
+        if self.canvas_origin != self.origin:
+            self.canvas_origin = self.origin.copy()
+            self.dirty_cells.clear()
+            self.draw_tile_lines()
+            self.canvas_surf.fill("grey")
+            for col, row, tile_id in self.canvas_data.query(*self.visible_cells()):
+                self.draw_tile((col, row), tile_id)
+            self.canvas_surf.blit(self.support_line_surf, (0, 0))
+            return [self.canvas_surf.get_rect()]
+
+        rects = []
+        for cell in self.dirty_cells:
+            rect = self.cell_rect(cell).clip(self.canvas_surf.get_rect())
+            if not rect:
+                continue
+            self.canvas_surf.fill("grey", rect)
+            if cell in self.canvas_data:
+                self.draw_tile(cell, self.canvas_data.get(cell))
+            self.canvas_surf.blit(self.support_line_surf, rect, rect)
+            rects.append(rect)
+        self.dirty_cells.clear()
+        return rects
+
+    def draw_overlays(self):
+        # the robots, preview and menu over the canvas; returns where they went
         self.canvas_objects.draw(self.display_surface)
+        rects = [sprite.rect.copy() for sprite in self.canvas_objects]
+
+        preview_rect = self.preview()
+        if preview_rect:
+            rects.append(preview_rect)
+
+        self.menu.display(self.selection_index)
+        # the selection highlight reaches a little outside the menu
+        rects.extend([self.menu.rect_top.inflate(8, 8), self.menu.rect_bottom.inflate(8, 8)])
+        return rects
 
     def preview(self):
         selected_object = self.mouse_on_object()
@@ -561,6 +621,7 @@ class Editor:
                 pygame.draw.lines(self.display_surface, color, False,
                                   ((rect.left, rect.bottom - size), rect.bottomleft, (rect.left + size, rect.bottom)),
                                   line_width)
+                return rect.inflate(line_width * 2, line_width * 2)
 
             else:
                 type_dict = {key: value['type'] for key, value in EDITOR_DATA.items()}
@@ -575,6 +636,7 @@ class Editor:
                         current_cell = self.get_current_cell()
                         rect = surf.get_rect(topleft=self.origin + vector(current_cell) * TILE_SIZE)
                     self.display_surface.blit(surf, rect)
+                    return rect
                 else:
                     pass
 
@@ -584,53 +646,20 @@ class Editor:
         self.canvas_objects.update(dt)
         self.object_timer.update()
 
-        # drawing
-        self.display_surface.fill("grey")
-        self.draw_level()
-        self.draw_tile_lines()
-        self.preview()
-        self.menu.display(self.selection_index)
-
-
-class CanvasTile:
-    def __init__(self, tile_id, offset=vector()):
-
-        self.is_empty = False
-        self.has_wall = False
-        self.wall_neighbors = []
-
-        self.has_obstacle = False
-
-        self.robot = None
-
-        self.objects = []
-
-        self.add_id(tile_id, offset)
-
-    def add_id(self, tile_id, offset=vector()):
-        options = {key: value['style'] for key, value in EDITOR_DATA.items()}
-        if options[tile_id] == 'terrain':
-            self.has_wall = True
-        elif options[tile_id] == 'obstacle':
-            self.has_obstacle = True
-        else:
-            if (tile_id, offset) not in self.objects:
-                self.objects.append((tile_id, offset))
-
-    def remove_id(self, tile_id):
-        options = {key: value['style'] for key, value in EDITOR_DATA.items()}
-        if options[tile_id] == 'terrain':
-            self.has_wall = False
-        elif options[tile_id] == 'obstacle':
-            self.has_obstacle = False
-        elif options[tile_id] == 'robot':
-            self.robot = None
-
-        self.check_content()
+        # drawing: the display keeps last frame's picture, so only the canvas rects that changed
+        # and last frame's overlays are copied back before the overlays are drawn again.
+        # Returns every rect that changed on the display, for pygame.display.update
+        changed = self.draw_level()
+        if self.full_redraw:
+            changed = [self.display_surface.get_rect()]
+            self.full_redraw = False
+        for rect in changed + self.overlay_rects:
+            self.display_surface.blit(self.canvas_surf, rect, rect)
 
-    def check_content(self):
-        if not self.has_wall and not self.has_obstacle and not self.robot:
-            self.is_empty = True
+        overlays = self.draw_overlays()
+        rects = changed + self.overlay_rects + overlays
+        self.overlay_rects = overlays
+        return rects
 
 
 class CanvasObject(pygame.sprite.Sprite):
@@ -641,7 +670,7 @@ class CanvasObject(pygame.sprite.Sprite):
         self.frames = frames
         self.frame_index = 0
 
-        self.image = pygame.image.load('graphics/robot_player.png').convert_alpha()
+        self.image = assets.load('graphics/robot_player.png')
         self.rect = self.image.get_rect(topleft=pos)
 
         self.distance_to_origin = vector(self.rect.topleft) - origin
@@ -665,7 +694,7 @@ class CanvasObject(pygame.sprite.Sprite):
     def animate(self, dt):
         self.frame_index += ANIMATION_SPEED * dt
         self.frame_index = 0 if self.frame_index >= len(self.frames) else self.frame_index
-        self.image = pygame.image.load('graphics/robot_player.png').convert_alpha()
+        self.image = assets.load('graphics/robot_player.png')
         self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
 
     def pan_pos(self, origin):
@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+
+
+class Fleet:
+    # Every robot's centre, target, speed and pause state live in (robots,) and (robots, 2) arrays
+    # that are advanced together once per frame, following the waypoints with one cursor per robot.
+    # The Robot sprites only hand over their waypoints and are written back to for drawing.
+    def __init__(self, robots):
+        self.robots = list(robots)
+        self.reset()
+
+    def reset(self):
+        for robot in self.robots:
+            robot.update_position()
+
+        count = len(self.robots)
+        self.pos = np.array([tuple(robot.pos) for robot in self.robots], dtype=float).reshape(count, 2)
+        self.target = self.pos.copy()
+        self.speed = np.array([robot.speed for robot in self.robots], dtype=float)
+        self.pause_time = np.array([robot.pause_time for robot in self.robots], dtype=float)
+        self.pause_until = np.zeros(count)
+        # started once S is pressed; following while a robot still has waypoints to drive to
+        self.started = np.zeros(count, dtype=bool)
+        self.following = np.zeros(count, dtype=bool)
+
+        # every robot's waypoints back to back; robot i owns first[i]:last[i] and cursor[i] is the
+        # waypoint it is heading for. waits flags waypoints that repeat the previous one, i.e. pauses
+        self.waypoints = np.empty((0, 2))
+        self.waits = np.zeros(0, dtype=bool)
+        self.first = np.zeros(count, dtype=int)
+        self.last = np.zeros(count, dtype=int)
+        self.cursor = np.zeros(count, dtype=int)
+
+    def load_waypoints(self):
+        waypoints = [robot.waypoints for robot in self.robots]
+        lengths = np.array([len(points) for points in waypoints], dtype=int)
+        self.last = np.cumsum(lengths)
+        self.first = self.last - lengths
+        self.cursor = self.first.copy()
+
+        self.waypoints = np.concatenate(waypoints + [np.empty((0, 2))])
+        previous = np.concatenate([np.concatenate([self.pos[i:i + 1], points])[:-1]
+                                   for i, points in enumerate(waypoints)] + [np.empty((0, 2))])
+        self.waits = (self.waypoints == previous).all(axis=1)
+
+    def start(self, now):
+        if self.started.any():
+            return
+        self.load_waypoints()
+        self.started[:] = True
+        self.advance(np.ones(len(self.robots), dtype=bool), now)
+
+    def advance(self, robots, now):
+        # points the given robots at the waypoint under their cursor, pausing on repeated ones;
+        # now is the time in ms, for all robots or per robot
+        self.following[robots] = self.cursor[robots] < self.last[robots]
+        heading = robots & self.following
+        self.target[heading] = self.waypoints[self.cursor[heading]]
+        pausing = heading.copy()
+        pausing[heading] = self.waits[self.cursor[heading]]
+        self.pause_until[pausing] = np.broadcast_to(now, pausing.shape)[pausing] + self.pause_time[pausing]
+
+    def update(self, dt):
+        now = pygame.time.get_ticks()
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_s]:
+            self.start(now)
+
+        # seconds of this frame each robot can spend driving; a robot reaching a waypoint drives on
+        # for what is left of the frame and pauses from the moment it arrived, so robots keep to
+        # the step times they were planned with
+        left = np.clip((now - self.pause_until) / 1000, 0, dt)
+        moved = self.following & (left > 0)
+        while True:
+            moving = self.following & (left > 0)
+            delta = self.target - self.pos
+            distance = np.hypot(delta[:, 0], delta[:, 1])
+            step = self.speed * left
+
+            arrived = moving & (distance <= step)
+            going = moving & ~arrived
+            self.pos[going] += delta[going] / distance[going, None] * step[going, None]
+            left[going] = 0
+            if not arrived.any():
+                break
+
+            self.pos[arrived] = self.target[arrived]
+            left[arrived] -= distance[arrived] / self.speed[arrived]
+            self.cursor[arrived] += 1
+            self.advance(arrived, now - left * 1000)
+            left[arrived] = np.minimum(left[arrived], np.clip((now - self.pause_until[arrived]) / 1000, 0, None))
+
+        self.drive(keys, dt)
+
+        for i in np.flatnonzero(moved):
+            self.robots[i].place(self.pos[i])
+
+    def drive(self, keys, dt):
+        # robots that finished their path can be driven with the arrow keys, colliding with obstacles
+        direction = pygame.math.Vector2(keys[pygame.K_RIGHT] - keys[pygame.K_LEFT],
+                                        keys[pygame.K_DOWN] - keys[pygame.K_UP])
+        if not direction:
+            return
+
+        direction = direction.normalize()
+        for i in np.flatnonzero(self.started & ~self.following):
+            robot = self.robots[i]
+            robot.drive(direction, dt)
+            self.pos[i] = tuple(robot.pos)
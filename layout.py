@@ -1,39 +1,21 @@
+import math
 import sys
-from itertools import permutations, product
+from collections import OrderedDict
 
 import numpy as np
 import pygame
 
-from pathfinding.core.grid import Grid
-from pathfinding.finder.a_star import AStarFinder
-from pathfinding.finder.dijkstra import DijkstraFinder
-from pathfinding.finder.breadth_first import BreadthFirstFinder
-from scipy.optimize import linear_sum_assignment
-
-from BatClustering import BatAlgorithmClustering
-from PSO import find_path_pso
+from fleet import Fleet
 from menu import MenuLayout
+from planning import PlanningCancelled, PlanningJob, algorithm_options, plan_paths
 from robot import Robot
+from spatial import SpatialHash
 from node import Node
 from settings import *
 import tkinter as tk
 from tkinter import messagebox
 from pygame.mouse import get_pos as mouse_pos
 from pygame.mouse import get_pressed as mouse_buttons
-from scipy.spatial import distance
-
-
-class Point:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-
-    def __repr__(self):
-        return f"Point(x={self.x}, y={self.y})"
-
-
-def convert_to_points(tuple_list):
-    return [Point(x, y) for x, y in tuple_list]
 
 
 class Layout:
@@ -48,12 +30,19 @@ class Layout:
 
         self.all_sprites = YSortCameraGroup()
         self.obstacle_sprites = pygame.sprite.Group()
+        self.obstacle_index = SpatialHash()
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
 
         self.build_level(layers, asset_dict)
+        self.fleet = Fleet(self.robots)
+        # cached path overlay, see draw_path
+        self.path_chunks = None
+        self.coord_to_robots = {}
+        self.path_cache = SurfaceCache(ZOOM_CACHE_PIXELS)
         self.menu = MenuLayout()
         self.selected_option = None
+        self.job = None
 
         self.grid = grid
         self.start_coords = start_coords
@@ -63,51 +52,73 @@ class Layout:
         for layer_name, layer in layers.items():
             for pos, data in layer.items():
                 if layer_name == 'wall':
-                    Node(pos, asset_dict['wall'], (self.all_sprites, self.obstacle_sprites))
+                    self.obstacle_index.add(Node(pos, asset_dict['wall'], (self.all_sprites, self.obstacle_sprites)))
                 if layer_name == 'obstacle':
-                    Node(pos, asset_dict['table'], (self.all_sprites, self.obstacle_sprites))
+                    self.obstacle_index.add(Node(pos, asset_dict['table'], (self.all_sprites, self.obstacle_sprites)))
                 if layer_name == 'robot':
-                    Robot(pos, [self.all_sprites, self.robots], self.obstacle_sprites)
+                    Robot(pos, [self.all_sprites, self.robots], self.obstacle_index)
 
-    def draw_path(self):
-        coord_to_robots = {}
+    def update_path_overlay(self):
+        # which points of which robot's path fall in each render chunk; the overlay chunks themselves
+        # are drawn on demand per zoom level and kept until the paths change
+        self.path_cache.clear()
+        self.path_chunks = {}
+        self.coord_to_robots = {}
 
         for robot in self.robots:
-            if robot.path:
-                for point in robot.path:
-                    coord = (point.x, point.y)
-                    if coord not in coord_to_robots:
-                        coord_to_robots[coord] = []
-                    coord_to_robots[coord].append(robot.color)
+            for x, y in robot.path.tolist():
+                self.coord_to_robots.setdefault((x, y), []).append(robot.color)
 
         for robot in self.robots:
-            if robot.path:
-                points = []
-                for point in robot.path:
-                    x = (
-                                point.x * TILE_SIZE) - self.all_sprites.offset.x + self.all_sprites.internal_offset.x + TILE_SIZE / 2
-                    y = (
-                                point.y * TILE_SIZE) - self.all_sprites.offset.y + self.all_sprites.internal_offset.y + TILE_SIZE / 2
-
-                    x = x * self.all_sprites.zoom_scale + self.half_width - self.all_sprites.internal_surf_size[
-                        0] * self.all_sprites.zoom_scale / 2
-                    y = y * self.all_sprites.zoom_scale + self.half_height - self.all_sprites.internal_surf_size[
-                        1] * self.all_sprites.zoom_scale / 2
-
-                    points.append((x, y))
-                    pygame.draw.circle(self.display_surface, robot.color, (x, y), 2)
-
-                for i in range(len(points) - 1):
-                    start_point = points[i]
-                    end_point = points[i + 1]
-                    coord = (robot.path[i].x, robot.path[i].y)
-
-                    if len(coord_to_robots[coord]) > 1:
-                        self.draw_multicolor_line(start_point, end_point, coord_to_robots[coord], 5)
-                    else:
-                        pygame.draw.line(self.display_surface, robot.color, start_point, end_point, 5)
-
-    def draw_multicolor_line(self, start_pos, end_pos, colors, width):
+            # each step spans from its point to the next one, the last point only covers itself
+            starts = robot.path
+            ends = np.concatenate([robot.path[1:], robot.path[-1:]])
+            corners = np.minimum(starts, ends) * TILE_SIZE
+            sizes = (np.abs(starts - ends) + 1) * TILE_SIZE
+            for i, (corner, size) in enumerate(zip(corners.tolist(), sizes.tolist())):
+                for key in self.all_sprites.chunk_keys(pygame.Rect(corner, size)):
+                    self.path_chunks.setdefault(key, {}).setdefault(robot, []).append(i)
+
+    def bake_path_chunk(self, key, scale):
+        size = round(RENDER_CHUNK_SIZE * scale)
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        origin = (key[0] * RENDER_CHUNK_SIZE, key[1] * RENDER_CHUNK_SIZE)
+
+        for robot, indices in self.path_chunks[key].items():
+            # the chunk's points and the ones they lead to, in chunk pixels
+            steps = np.array(indices)
+            following = np.minimum(steps + 1, len(robot.path) - 1)
+            points = ((robot.path[steps] * TILE_SIZE + TILE_SIZE / 2 - origin) * scale).tolist()
+            next_points = ((robot.path[following] * TILE_SIZE + TILE_SIZE / 2 - origin) * scale).tolist()
+            coords = robot.path[steps].tolist()
+
+            for point in points:
+                pygame.draw.circle(surface, robot.color, point, 2)
+
+            for i, start_point, end_point, coord in zip(indices, points, next_points, coords):
+                if i + 1 == len(robot.path):
+                    continue
+                coord = tuple(coord)
+
+                if len(self.coord_to_robots[coord]) > 1:
+                    self.draw_multicolor_line(surface, start_point, end_point, self.coord_to_robots[coord], 5)
+                else:
+                    pygame.draw.line(surface, robot.color, start_point, end_point, 5)
+        return surface
+
+    def draw_path(self):
+        if self.path_chunks is None:
+            self.update_path_overlay()
+
+        camera = self.all_sprites
+        scale = camera.render_scale()
+        for key in camera.chunk_keys(camera.visible_rect()):
+            if key in self.path_chunks:
+                overlay = self.path_cache.get((key, scale), lambda: self.bake_path_chunk(key, scale))
+                self.display_surface.blit(overlay, camera.to_screen(key[0] * RENDER_CHUNK_SIZE,
+                                                                    key[1] * RENDER_CHUNK_SIZE))
+
+    def draw_multicolor_line(self, surface, start_pos, end_pos, colors, width):
         length = ((end_pos[0] - start_pos[0]) ** 2 + (end_pos[1] - start_pos[1]) ** 2) ** 0.5
         total_segments = int(length / 10)
         num_colors = len(colors)
@@ -126,237 +137,67 @@ class Layout:
             )
 
             segment_color = colors[i % num_colors]
-            pygame.draw.line(self.display_surface, segment_color, segment_start, segment_end, width)
-
-    def BFS_one_to_one(self, grid, start_coords, end_coords):
-        try:
-            helpers = []
-            for direction in ((-1, 0), (1, 0), (0, 1), (0, -1)):
-                if grid[end_coords[0][0] - direction[0]][end_coords[0][1] - direction[1]] != 0:
-                    helpers.append((end_coords[0][0] - direction[0], end_coords[0][1] - direction[1]))
-
-            if not helpers:
-                raise ValueError("Unable to find a valid coordinate to go to.")
-
-            paths = []
-            grid = Grid(matrix=grid)
-            start_point = grid.node(start_coords[0][0], start_coords[0][1])
-            for helper in helpers:
-                end_point = grid.node(helper[1], helper[0])
-                finder = BreadthFirstFinder()
-                path, _ = finder.find_path(start_point, end_point, grid)
-                if not path:
-                    raise ValueError("No path found from start to end coordinates.")
-                paths.append(path)
-                grid.cleanup()
-
-            if not paths:
-                raise ValueError("No valid paths were found.")
-
-            for robot in self.robots:
-                if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                        start_coords[0][0] * TILE_SIZE, start_coords[0][1] * TILE_SIZE):
-                    robot.set_path(min(paths, key=len))
-
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Error", str(e))
-            self.switch()
-
-    def Dijkstra_one_to_one(self, grid, start_coords, end_coords):
-        try:
-            helpers = []
-            for direction in ((-1, 0), (1, 0), (0, 1), (0, -1)):
-                if grid[end_coords[0][0] - direction[0]][end_coords[0][1] - direction[1]] != 0:
-                    helpers.append((end_coords[0][0] - direction[0], end_coords[0][1] - direction[1]))
-
-            if not helpers:
-                raise ValueError("Unable to find a valid coordinate to go to.")
-
-            paths = []
-            grid = Grid(matrix=grid)
-            start_point = grid.node(start_coords[0][0], start_coords[0][1])
-            for helper in helpers:
-                end_point = grid.node(helper[1], helper[0])
-                finder = DijkstraFinder()
-                path, _ = finder.find_path(start_point, end_point, grid)
-                if not path:
-                    raise ValueError("No path found from start to end coordinates.")
-                paths.append(path)
-                grid.cleanup()
-
-            if not paths:
-                raise ValueError("No valid paths were found.")
-
-            for robot in self.robots:
-                if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                        start_coords[0][0] * TILE_SIZE, start_coords[0][1] * TILE_SIZE):
-                    robot.set_path(min(paths, key=len))
-
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Error", str(e))
-            self.switch()
-
-    def Astar_one_to_one(self, grid, start_coords, end_coords):
-
-        try:
-            helpers = []
-            for direction in ((-1, 0), (1, 0), (0, 1), (0, -1)):
-                if grid[end_coords[0][0] - direction[0]][end_coords[0][1] - direction[1]] != 0:
-                    helpers.append((end_coords[0][0] - direction[0], end_coords[0][1] - direction[1]))
-
-            if not helpers:
-                raise ValueError("Unable to find a valid coordinate to go to.")
-
-            paths = []
-            grid = Grid(matrix=grid)
-            start_point = grid.node(start_coords[0][0], start_coords[0][1])
-            for helper in helpers:
-                end_point = grid.node(helper[1], helper[0])
-                finder = AStarFinder()
-                path, _ = finder.find_path(start_point, end_point, grid)
-                if not path:
-                    raise ValueError("No path found from start to end coordinates.")
-                paths.append(path)
-                grid.cleanup()
-
-            if not paths:
-                raise ValueError("No valid paths were found.")
-
-            for robot in self.robots:
-                if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                        start_coords[0][0] * TILE_SIZE, start_coords[0][1] * TILE_SIZE):
-                    robot.set_path(min(paths, key=len))
-
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Error", str(e))
-            self.switch()
-
-    def Dijkstra_one_to_many(self, grid, start_coords, end_coords_list):
-        def get_helpers(target, grid):
-            helpers = []
-            for direction in [(-1, 0), (1, 0), (0, 1), (0, -1)]:
-                helper = (target[0] + direction[0], target[1] + direction[1])
-                if 0 <= helper[0] < len(grid) and 0 <= helper[1] < len(grid[0]):
-                    if grid[helper[0]][helper[1]] != 0:
-                        helpers.append(helper)
-            return helpers
-
-        try:
-            shortest_path = None
-            min_path_length = float('inf')
-
-            all_helpers_combinations = [get_helpers(target, grid) for target in end_coords_list]
-
-            if not all_helpers_combinations or any(not helpers for helpers in all_helpers_combinations):
-                raise ValueError("Unable to find any valid helper coordinates for one or more targets.")
-
-            for helper_combination in product(*all_helpers_combinations):
-                if len(set(helper_combination)) < len(helper_combination):
-                    continue
+            pygame.draw.line(surface, segment_color, segment_start, segment_end, width)
 
-                for perm in permutations(helper_combination):
-                    current_point = (start_coords[0][1], start_coords[0][0])
-                    total_path = []
-                    path_length = 0
-
-                    for helper in perm:
-                        grid = Grid(matrix=self.grid)
-                        start_node = grid.node(current_point[1], current_point[0])
-                        end_node = grid.node(helper[1], helper[0])
-                        finder = DijkstraFinder()
-                        path, _ = finder.find_path(start_node, end_node, grid)
-                        if not path:
-                            raise ValueError("No valid paths were found.")
-                        total_path.extend(path)
-                        path_length += len(path) - 1
-                        current_point = helper
-
-                    if path_length < min_path_length:
-                        min_path_length = path_length
-                        shortest_path = total_path
-
-            if not shortest_path:
-                raise ValueError("No valid paths were found.")
-
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Error", str(e))
-            self.switch()
-        else:
-            for robot in self.robots:
-                if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                        start_coords[0][0] * TILE_SIZE, start_coords[0][1] * TILE_SIZE):
-                    robot.set_path(shortest_path)
-
-    def Astar_one_to_many(self, grid, start_coords, end_coords_list):
-        def get_helpers(target, grid):
-            helpers = []
-            for direction in [(-1, 0), (1, 0), (0, 1), (0, -1)]:
-                helper = (target[0] + direction[0], target[1] + direction[1])
-                if 0 <= helper[0] < len(grid) and 0 <= helper[1] < len(grid[0]):
-                    if grid[helper[0]][helper[1]] != 0:
-                        helpers.append(helper)
-            return helpers
-
-        try:
-            shortest_path = None
-            min_path_length = float('inf')
-
-            all_helpers_combinations = [get_helpers(target, grid) for target in end_coords_list]
-
-            if not all_helpers_combinations or any(not helpers for helpers in all_helpers_combinations):
-                raise ValueError("Unable to find any valid helper coordinates for one or more targets.")
-
-            for helper_combination in product(*all_helpers_combinations):
-                if len(set(helper_combination)) < len(helper_combination):
-                    continue
+    def show_error(self, e):
+        print(f"An error occurred: {str(e)}")
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("Error", str(e))
+        self.switch()
 
-                for perm in permutations(helper_combination):
-                    current_point = (start_coords[0][1], start_coords[0][0])
-                    total_path = []
-                    path_length = 0
-
-                    for helper in perm:
-                        grid = Grid(matrix=self.grid)
-                        start_node = grid.node(current_point[1], current_point[0])
-                        end_node = grid.node(helper[1], helper[0])
-                        finder = AStarFinder()
-                        path, _ = finder.find_path(start_node, end_node, grid)
-                        if not path:
-                            raise ValueError("No valid paths were found.")
-                        total_path.extend(path)
-                        path_length += len(path) - 1
-                        current_point = helper
-
-                    if path_length < min_path_length:
-                        min_path_length = path_length
-                        shortest_path = total_path
-
-            if not shortest_path:
-                raise ValueError("No valid paths were found.")
-
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Error", str(e))
-            self.switch()
+    def set_robot_path(self, start, path):
+        for robot in self.robots:
+            if (robot.pos_top_left[0], robot.pos_top_left[1]) == (start[0] * TILE_SIZE, start[1] * TILE_SIZE):
+                robot.set_path(path)
+                self.path_chunks = None
+
+    def plan(self, algorithm):
+        # planning runs on a background thread, run() picks the paths up once it's done
+        self.job = PlanningJob(plan_paths, algorithm, self.grid, self.start_coords, self.end_coords,
+                               PLANNING_BACKEND, PLANNING_WORKERS).start()
+
+    def cancel_planning(self):
+        if self.job:
+            self.job.cancel()
+
+    def check_planning(self):
+        if not self.job:
+            return
+
+        self.job.poll()
+        if not self.job.done:
+            self.draw_planning_progress()
+            return
+
+        job, self.job = self.job, None
+        if job.cancelled or isinstance(job.error, PlanningCancelled):
+            print("Planning cancelled.")
+        elif job.error:
+            self.show_error(job.error)
         else:
-            for robot in self.robots:
-                if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                        start_coords[0][0] * TILE_SIZE, start_coords[0][1] * TILE_SIZE):
-                    robot.set_path(shortest_path)
+            for start, path in zip(self.start_coords, job.result):
+                if path is not None:
+                    self.set_robot_path(start, path)
+            # S may have been pressed while planning, which started the fleet without waypoints;
+            # the robots go back to their start and set off on the new paths right away
+            started = self.fleet.started.any()
+            self.reset_robots()
+            if started:
+                self.fleet.start(pygame.time.get_ticks())
+
+    def draw_planning_progress(self):
+        progress = dict(self.job.progress)
+        stage = progress.pop('stage', 'starting')
+        values = ', '.join(f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}"
+                           for key, value in progress.items())
+        text = f"Planning ({stage}{': ' + values if values else ''}) - C or reset to cancel"
+
+        font = pygame.font.Font(None, 32)
+        text_surf = font.render(text, True, pygame.Color('white'))
+        text_rect = text_surf.get_rect(midbottom=(self.half_width, self.display_surface.get_height() - 10))
+        pygame.draw.rect(self.display_surface, pygame.Color('grey'), text_rect.inflate(10, 10))
+        self.display_surface.blit(text_surf, text_rect)
 
     def choose_algorithm_popup(self):
         input_active = True
@@ -367,12 +208,7 @@ class Layout:
         option_height = 50
         menu_width = 400
 
-        if len(self.start_coords) == 1 and len(self.end_coords) == 1:
-            options = [['BFS', 'BFS 1to1'], ['Dijkstra', 'Dijkstra 1to1'], ['A*', 'A* 1to1'], ['PSO', 'PSO']]
-        elif len(self.start_coords) == 1 and len(self.end_coords) > 1:
-            options = [['Dijkstra', 'Dijkstra 1toMany'], ['A*', 'A* 1toMany'], ['PSO', 'PSO']]
-        else:
-            options = [['A* with pause', 'A* ManytoManyP'], ['PSO', 'PSO ManytoMany']]
+        options = algorithm_options(len(self.start_coords), len(self.end_coords))
 
         menu_height = option_height * len(options) + 40
 
@@ -434,119 +270,18 @@ class Layout:
         return selected_option, selected_option_text
 
     def reset_robots(self):
-        for robot in self.robots:
-            robot.update_position()
-
-    def assign_clusters_to_robots(self, centroids):
-        num_robots = len(self.robots)
-        num_clusters = len(centroids)
-
-        dist_matrix = np.zeros((num_robots, num_clusters))
-        for i, robot in enumerate(self.robots):
-            for j, centroid in enumerate(centroids):
-                dist_matrix[i, j] = distance.euclidean(robot.pos_top_left, np.array(centroid))
-
-        row_ind, col_ind = linear_sum_assignment(dist_matrix)
-
-        assignment = {cluster_idx: robot_idx for robot_idx, cluster_idx in zip(row_ind, col_ind)}
-
-        return assignment
-
-    def add_pauses_for_same_positions(self):
-        max_length = max(len(robot.path) for robot in self.robots)
-
-        for i in range(max_length):
-            positions_at_i = []
-
-            for robot in self.robots:
-                if i < len(robot.path):
-                    positions_at_i.append((robot.path[i].x, robot.path[i].y))
-                else:
-                    positions_at_i.append(None)
-
-            unique_positions = set(filter(None, positions_at_i))
-
-            if len(unique_positions) < len(positions_at_i):
-                for pos in unique_positions:
-                    indexes_with_pos = [index for index, value in enumerate(positions_at_i) if value == pos]
-
-                    if len(indexes_with_pos) > 1:
-                        min_length = min(len(robot.path) for robot in self.robots)
-                        shortest_paths = [robot.path for robot in self.robots if
-                                          len(robot.path) == min_length]
-
-                        for robot in self.robots:
-                            if shortest_paths[0] == robot.path:
-                                robot.path.insert(i - 1, robot.path[i - 1])
-
-    def max_manhattan_distance(self, cluster=None):
-        if cluster is None:
-            cluster = self.end_coords
-        max_distance = 0
-        for end in cluster:
-            distance = abs(self.start_coords[0][1] - end[0]) + abs(self.start_coords[0][1] - end[1])
-            if distance > max_distance:
-                max_distance = distance
-        return max_distance
+        self.fleet.reset()
 
     def menu_click(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and self.menu.rect_top.collidepoint(mouse_pos()):
             new_index = self.menu.click(mouse_pos(), mouse_buttons())
-            if new_index == 9:
+            if new_index == 9 and not self.job:
                 selected_algorithm, self.selected_option = self.choose_algorithm_popup()
                 if selected_algorithm:
                     self.reset_robots()
-                if selected_algorithm == 'BFS 1to1':
-                    self.BFS_one_to_one(self.grid, self.start_coords, self.end_coords)
-                if selected_algorithm == 'Dijkstra 1to1':
-                    self.Dijkstra_one_to_one(self.grid, self.start_coords, self.end_coords)
-                if selected_algorithm == 'A* 1to1':
-                    self.Astar_one_to_one(self.grid, self.start_coords, self.end_coords)
-                if selected_algorithm == 'Dijkstra 1toMany':
-                    self.Dijkstra_one_to_many(self.grid, self.start_coords, self.end_coords)
-                if selected_algorithm == 'A* 1toMany':
-                    self.Astar_one_to_many(self.grid, self.start_coords, self.end_coords)
-                if selected_algorithm == 'PSO':
-                    max_waypoint = len(self.grid) * len(self.grid[0])
-                    min_waypoint = self.max_manhattan_distance()
-                    best_path = find_path_pso(self.grid, self.start_coords, self.end_coords, min_waypoint, max_waypoint,
-                                              5)
-                    if best_path is not None:
-                        best_path = convert_to_points(best_path)
-                        for robot in self.robots:
-                            if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                                    self.start_coords[0][0] * TILE_SIZE, self.start_coords[0][1] * TILE_SIZE):
-                                robot.set_path(best_path)
-                if selected_algorithm == 'A* ManytoManyP':
-                    bat_clustering = BatAlgorithmClustering(self.end_coords, len(self.robots))
-                    centroids, clusters = bat_clustering.run()
-                    print("Centroids:", centroids)
-                    for i, cluster in enumerate(clusters):
-                        print(f"Cluster {i + 1}: {cluster}")
-                    assignment = self.assign_clusters_to_robots(centroids)
-                    for i, cluster in enumerate(clusters):
-                        self.Astar_one_to_many(self.grid, [self.start_coords[assignment[i]]], cluster)
-                    self.add_pauses_for_same_positions()
-                if selected_algorithm == 'PSO ManytoMany':
-                    bat_clustering = BatAlgorithmClustering(self.end_coords, len(self.robots))
-                    centroids, clusters = bat_clustering.run()
-                    print("Centroids:", centroids)
-                    for i, cluster in enumerate(clusters):
-                        print(f"Cluster {i + 1}: {cluster}")
-                    assignment = self.assign_clusters_to_robots(centroids)
-                    for i, cluster in enumerate(clusters):
-                        cluster = [tuple(arr) for arr in cluster]
-                        max_waypoint = len(self.grid) * len(self.grid[0])
-                        min_waypoint = self.max_manhattan_distance()
-                        best_path = find_path_pso(self.grid, [self.start_coords[assignment[i]]], cluster, min_waypoint,
-                                                  max_waypoint, 5)
-                        best_path = convert_to_points(best_path)
-                        for robot in self.robots:
-                            if (robot.pos_top_left[0], robot.pos_top_left[1]) == (
-                                    self.start_coords[assignment[i]][0] * TILE_SIZE,
-                                    self.start_coords[assignment[i]][1] * TILE_SIZE):
-                                robot.set_path(best_path)
-                    self.add_pauses_for_same_positions()
+                    self.plan(selected_algorithm)
+            elif new_index == 10 and self.job:
+                self.cancel_planning()
             elif new_index == 10:
                 self.reset_robots()
 
@@ -559,7 +294,10 @@ class Layout:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+                self.cancel_planning()
                 self.switch(layout=True)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                self.cancel_planning()
             if event.type == pygame.MOUSEWHEEL and 0.2 <= self.all_sprites.zoom_scale <= 1:
                 self.all_sprites.zoom_scale += event.y * 0.03
             if event.type == pygame.MOUSEWHEEL and (
@@ -604,7 +342,7 @@ class Layout:
 
         self.draw_path()
         self.event_loop()
-        self.all_sprites.update(dt, self.grid, self.start_coords, self.end_coords)
+        self.fleet.update(dt)
         self.menu.display()
         if self.selected_option:
             font = pygame.font.Font(None, 32)
@@ -617,6 +355,33 @@ class Layout:
 
             self.display_surface.blit(text_surf, text_rect)
 
+        self.check_planning()
+
+
+class SurfaceCache:
+    # least recently used surfaces, evicted oldest first once they hold more than max_pixels
+    def __init__(self, max_pixels):
+        self.max_pixels = max_pixels
+        self.pixels = 0
+        self.surfaces = OrderedDict()
+
+    def get(self, key, build):
+        if key in self.surfaces:
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        surface = build()
+        self.surfaces[key] = surface
+        self.pixels += surface.get_width() * surface.get_height()
+        while self.pixels > self.max_pixels and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.pixels -= evicted.get_width() * evicted.get_height()
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.pixels = 0
+
 
 class YSortCameraGroup(pygame.sprite.Group):
     def __init__(self):
@@ -628,17 +393,107 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.offset = pygame.math.Vector2()
 
         self.zoom_scale = 0.4
-        self.internal_surf_size = (2500, 2500)
-        self.internal_surf = pygame.Surface(self.internal_surf_size, pygame.SRCALPHA)
-        self.internal_rect = self.internal_surf.get_rect(center=(self.half_height, self.half_width))
-        self.internal_surf_size_vector = pygame.math.Vector2(self.internal_surf_size)
-        self.internal_offset = pygame.math.Vector2()
-        self.internal_offset.x = self.internal_surf_size[0] // 2 - self.half_width
-        self.internal_offset.y = self.internal_surf_size[1] // 2 - self.half_height
+        # the world point drawn at the middle of the display is offset - internal_offset
+        self.internal_offset = pygame.math.Vector2(-self.half_width, -self.half_height)
 
         self.is_panning = False
         self.pan_start_pos = pygame.math.Vector2()
 
+        # walls and tables never move: they are indexed by RENDER_CHUNK_SIZE chunk, and chunks and
+        # robots are drawn once per zoom level into the cache; the index and the cache are rebuilt
+        # after a static sprite joins or leaves
+        self.static_chunks = None
+        self.static_rect = None
+        self.surface_cache = SurfaceCache(ZOOM_CACHE_PIXELS)
+
+        self.drawn_scale = None
+        self.idle_frames = 0
+        self.screen_origin = (0, 0)
+
+        # robots are kept apart from the static sprites so drawing them never walks the map
+        self.robots = {}
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if isinstance(sprite, Robot):
+            self.robots[sprite] = None
+        else:
+            self.static_chunks = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if isinstance(sprite, Robot):
+            self.robots.pop(sprite, None)
+        else:
+            self.static_chunks = None
+
+    def chunk_keys(self, rect):
+        for x in range(rect.left // RENDER_CHUNK_SIZE, (rect.right - 1) // RENDER_CHUNK_SIZE + 1):
+            for y in range(rect.top // RENDER_CHUNK_SIZE, (rect.bottom - 1) // RENDER_CHUNK_SIZE + 1):
+                yield x, y
+
+    def index_static(self):
+        self.static_chunks = {}
+        self.surface_cache.clear()
+        static_sprites = [sprite for sprite in self.sprites() if not isinstance(sprite, Robot)]
+        for sprite in static_sprites:
+            for key in self.chunk_keys(sprite.rect):
+                self.static_chunks.setdefault(key, []).append(sprite)
+        self.static_rect = static_sprites[0].rect.unionall([sprite.rect for sprite in static_sprites]) \
+            if static_sprites else None
+
+    def bake_chunk(self, key):
+        # baked on the same white the map is cleared to, so each pixel is blended once
+        surface = pygame.Surface((RENDER_CHUNK_SIZE, RENDER_CHUNK_SIZE))
+        surface.fill('#FFFFFF')
+        origin = (key[0] * RENDER_CHUNK_SIZE, key[1] * RENDER_CHUNK_SIZE)
+        for sprite in sorted(self.static_chunks[key], key=lambda sprite: sprite.rect.centery):
+            surface.blit(sprite.image, (sprite.rect.x - origin[0], sprite.rect.y - origin[1]))
+        return surface
+
+    def bake_robot(self, robot):
+        surface = robot.image.copy()
+        self.draw_corner_lines(surface, surface.get_rect(), color=robot.color)
+        return surface
+
+    def scaled(self, key, bake, scale, smooth):
+        # key's surface at the given zoom level, built from its cached full size version
+        def build():
+            surface = self.surface_cache.get((key, 1, False), bake)
+            size = (round(surface.get_width() * scale), round(surface.get_height() * scale))
+            if smooth:
+                return pygame.transform.smoothscale(surface, size)
+            return pygame.transform.scale(surface, size)
+
+        if scale == 1:
+            return self.surface_cache.get((key, 1, False), bake)
+        return self.surface_cache.get((key, scale, smooth), build)
+
+    def render_scale(self):
+        # zoom_scale rounded to a whole number of ZOOM_STEPS, so a tile is always a whole number of pixels
+        return max(1, round(self.zoom_scale * ZOOM_STEPS)) / ZOOM_STEPS
+
+    def to_screen(self, x, y):
+        # everything is placed from one rounded screen origin per frame; chunks scale to whole
+        # pixels, so they tile without seams
+        scale = self.render_scale()
+        return self.screen_origin[0] + round(x * scale), self.screen_origin[1] + round(y * scale)
+
+    def view_center(self):
+        return self.offset - self.internal_offset
+
+    def world_to_screen(self, point):
+        return (pygame.math.Vector2(point) - self.view_center()) * self.render_scale() + \
+            pygame.math.Vector2(self.half_width, self.half_height)
+
+    def visible_rect(self):
+        # world area covered by the display at the current zoom
+        width = math.ceil(self.display_surface.get_width() / self.render_scale()) + 1
+        height = math.ceil(self.display_surface.get_height() / self.render_scale()) + 1
+        rect = pygame.Rect(0, 0, width, height)
+        rect.center = self.view_center()
+        return rect
+
     def start_panning(self):
         self.is_panning = True
         self.pan_start_pos = pygame.math.Vector2(pygame.mouse.get_pos())
@@ -664,40 +519,40 @@ class YSortCameraGroup(pygame.sprite.Group):
         if keys[pygame.K_e] and self.zoom_scale > 0.4:
             self.zoom_scale -= 0.01
 
-    def draw_corner_lines(self, rect, line_length=10, offset=2, color=(255, 0, 0), thickness=5):
+    def draw_corner_lines(self, surface, rect, line_length=10, offset=2, color=(255, 0, 0), thickness=5):
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.left + offset, rect.top + offset),
             (rect.left + line_length + offset, rect.top + offset), thickness)
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.left + offset, rect.top + offset),
             (rect.left + offset, rect.top + line_length + offset), thickness)
 
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.right - offset, rect.top + offset),
             (rect.right - line_length - offset, rect.top + offset), thickness)
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.right - offset, rect.top + offset),
             (rect.right - offset, rect.top + line_length + offset), thickness)
 
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.left + offset, rect.bottom - offset),
             (rect.left + line_length + offset, rect.bottom - offset), thickness)
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.left + offset, rect.bottom - offset),
             (rect.left + offset, rect.bottom - line_length - offset), thickness)
 
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.right - offset, rect.bottom - offset),
             (rect.right - line_length - offset, rect.bottom - offset), thickness)
         pygame.draw.line(
-            self.internal_surf, color,
+            surface, color,
             (rect.right - offset, rect.bottom - offset),
             (rect.right - offset, rect.bottom - line_length - offset), thickness)
 
@@ -709,22 +564,43 @@ class YSortCameraGroup(pygame.sprite.Group):
             self.zoom_keyboard_control()
             self.update_pan()
 
-        # zoom
-        self.internal_surf.fill('#FFFFFF')
-
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):
-            offset_rect = sprite.rect.topleft - self.offset + self.internal_offset
-            scaled_offset_rect = pygame.Rect(
-                offset_rect[0],
-                offset_rect[1],
-                sprite.rect.width,
-                sprite.rect.height
-            )
-            self.internal_surf.blit(sprite.image, offset_rect)
-            if isinstance(sprite, Robot):
-                self.draw_corner_lines(scaled_offset_rect, color=sprite.color)
-
-        scaled_surf = pygame.transform.scale(self.internal_surf, self.internal_surf_size_vector * self.zoom_scale)
-        scaled_rect = scaled_surf.get_rect(center=(self.half_width, self.half_height))
-
-        self.display_surface.blit(scaled_surf, scaled_rect)
+        if self.static_chunks is None:
+            self.index_static()
+
+        # full size scaling while the zoom changes, smoothscale once it has settled
+        scale = self.render_scale()
+        self.idle_frames = self.idle_frames + 1 if scale == self.drawn_scale else 0
+        self.drawn_scale = scale
+        smooth = SMOOTH_ZOOM_IDLE_FRAMES is not None and self.idle_frames >= SMOOTH_ZOOM_IDLE_FRAMES
+        self.screen_origin = self.world_to_screen((0, 0))
+        self.screen_origin = (round(self.screen_origin.x), round(self.screen_origin.y))
+
+        robots = list(self.robots)
+        map_rects = [robot.rect for robot in robots] + ([self.static_rect] if self.static_rect else [])
+        if not map_rects:
+            return
+        # only the part of the map on screen is drawn
+        map_rect = map_rects[0].unionall(map_rects[1:])
+        view_rect = self.visible_rect().clip(map_rect)
+        if not view_rect.width or not view_rect.height:
+            return
+
+        left, top = self.to_screen(*map_rect.topleft)
+        right, bottom = self.to_screen(*map_rect.bottomright)
+        map_screen_rect = pygame.Rect(left, top, right - left, bottom - top)
+        self.display_surface.fill('#FFFFFF', map_screen_rect)
+        # chunks are cleared to white past the edge of the map
+        previous_clip = self.display_surface.get_clip()
+        self.display_surface.set_clip(map_screen_rect.clip(previous_clip))
+
+        for key in self.chunk_keys(view_rect):
+            if self.static_chunks.get(key):
+                chunk = self.scaled(key, lambda: self.bake_chunk(key), scale, smooth)
+                self.display_surface.blit(chunk, self.to_screen(key[0] * RENDER_CHUNK_SIZE, key[1] * RENDER_CHUNK_SIZE))
+
+        visible_robots = [robot for robot in robots if robot.rect.colliderect(view_rect)]
+        for sprite in sorted(visible_robots, key=lambda sprite: sprite.rect.centery):
+            image = self.scaled(sprite, lambda: self.bake_robot(sprite), scale, smooth)
+            self.display_surface.blit(image, self.to_screen(*sprite.rect.topleft))
+
+        self.display_surface.set_clip(previous_clip)
@@ -2,14 +2,11 @@ import pygame
 from pygame.image import load
 from pygame.math import Vector2 as vector
 
+from assets import assets
 from editor import Editor
 from layout import Layout
 from settings import *
 
-pygame.init()
-
-screen = pygame.display.set_mode((800, 600))
-
 
 class Game:
     def __init__(self):
@@ -24,15 +21,15 @@ class Game:
 
         self.clock = pygame.time.Clock()
 
-        self.wall_image = load('graphics/wall.png').convert_alpha()
-        self.table_image = load('graphics/table.png').convert_alpha()
+        self.wall_image = assets.load('graphics/wall.png')
+        self.table_image = assets.load('graphics/table.png')
 
         self.layout = None
         self.editor_active = True
         self.transition = Transition(self.toggle)
         self.editor = Editor(self.switch)
 
-        surf = load("graphics/mouse.png").convert_alpha()
+        surf = assets.load("graphics/mouse.png")
         cursor = pygame.cursors.Cursor((0, 0), surf)
         pygame.mouse.set_cursor(cursor)
 
@@ -72,15 +69,24 @@ class Game:
 
     def run(self):
         while True:
-            self.screen.fill('black')
             dt = self.clock.tick(FPS) / 1000
             if self.editor_active:
-                self.editor.run(dt)
+                # the editor repaints only what changed, on top of its last frame
+                rects = self.editor.run(dt)
             else:
+                self.screen.fill('black')
                 self.layout.run(dt)
+                rects = None
 
+            if self.transition.active:
+                # the transition covers the whole screen, the editor repaints all of it afterwards
+                self.editor.full_redraw = True
+                rects = None
             self.transition.display(dt)
-            pygame.display.update()
+            if rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(rects)
 
 
 class Transition:
@@ -0,0 +1,106 @@
+import json
+import lzma
+import mmap
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Binary map files: a fixed header followed by the payload, optionally compressed as a whole.
+# The payload holds the start coordinates as (starts, 2) int32 (x, y), the end coordinates as
+# (ends, 2) int32 (row, col) and the grid's free cells as one bit each, row by row (np.packbits).
+# The header is magic, version, compression, rows, cols, starts, ends and the payload's CRC32.
+MAGIC = b'RMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sHH5I')
+COMPRESSIONS = {'none': 0, 'zlib': 1, 'lzma': 2}
+
+
+def save_map(path, grid, start_coords, end_coords, compression='zlib'):
+    grid = np.asarray(grid)
+    starts = np.asarray(start_coords, dtype='<i4').reshape(-1, 2)
+    ends = np.asarray(end_coords, dtype='<i4').reshape(-1, 2)
+    payload = starts.tobytes() + ends.tobytes() + np.packbits(grid != 0).tobytes()
+
+    header = HEADER.pack(MAGIC, VERSION, COMPRESSIONS[compression], grid.shape[0], grid.shape[1],
+                         len(starts), len(ends), zlib.crc32(payload))
+    if compression == 'zlib':
+        payload = zlib.compress(payload, 9)
+    elif compression == 'lzma':
+        payload = lzma.compress(payload)
+
+    with open(path, 'wb') as map_file:
+        map_file.write(header + payload)
+
+
+def load_map(path):
+    # binary map files and the JSON saves alike, told apart by the first bytes; returns
+    # {'grid': (rows, cols) uint8 with 1 for free cells, 'start': (n, 2) int32, 'end': (m, 2) int32}
+    with open(path, 'rb') as map_file:
+        if map_file.read(len(MAGIC)) != MAGIC:
+            map_file.seek(0)
+            data = json.load(map_file)
+            return {
+                'grid': np.array(data['grid'], dtype=np.uint8),
+                'start': np.array(data['start'], dtype=np.int32).reshape(-1, 2),
+                'end': np.array(data['end'], dtype=np.int32).reshape(-1, 2),
+            }
+
+        if os.fstat(map_file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"Map file {path} is damaged.")
+        # the file is mapped rather than read, an uncompressed payload is used straight from it
+        with mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header = HEADER.unpack_from(mapped)
+            view = memoryview(mapped)[HEADER.size:]
+            try:
+                return read_payload(path, header, view)
+            finally:
+                # nothing may point into the mapping once it closes
+                view.release()
+
+
+def read_payload(path, header, payload):
+    _, version, compression, rows, cols, start_count, end_count, crc = header
+    if version != VERSION:
+        raise ValueError(f"Unsupported map file version: {version}")
+    try:
+        if compression == COMPRESSIONS['zlib']:
+            payload = zlib.decompress(payload)
+        elif compression == COMPRESSIONS['lzma']:
+            payload = lzma.decompress(payload)
+        elif compression != COMPRESSIONS['none']:
+            raise ValueError(f"Unknown map file compression: {compression}")
+    except (zlib.error, lzma.LZMAError):
+        raise ValueError(f"Map file {path} is damaged.")
+    # the CRC only covers the payload, so the header's counts must also add up to its length
+    if zlib.crc32(payload) != crc or len(payload) != (start_count + end_count) * 8 + (rows * cols + 7) // 8:
+        raise ValueError(f"Map file {path} is damaged.")
+
+    starts = np.frombuffer(payload, dtype='<i4', count=start_count * 2).reshape(-1, 2)
+    ends = np.frombuffer(payload, dtype='<i4', count=end_count * 2, offset=starts.nbytes).reshape(-1, 2)
+    bits = np.frombuffer(payload, dtype=np.uint8, offset=starts.nbytes + ends.nbytes)
+    # copies, the payload may be the mapped file
+    return {
+        'grid': np.unpackbits(bits, count=rows * cols).reshape(rows, cols),
+        'start': starts.astype(np.int32),
+        'end': ends.astype(np.int32),
+    }
+
+
+def convert(path, compression='zlib'):
+    # writes path's map next to it as a .map file
+    data = load_map(path)
+    out_path = Path(path).with_suffix('.map')
+    save_map(out_path, data['grid'], data['start'], data['end'], compression)
+    return out_path
+
+
+if __name__ == "__main__":
+    # python -m mapfile saves/a.txt [saves/b.txt ...] [--zlib | --lzma | --none]
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    chosen = options[-1][2:] if options else 'zlib'
+    for path in [arg for arg in sys.argv[1:] if not arg.startswith('--')]:
+        print(f"{path} -> {convert(path, chosen)}")
@@ -1,6 +1,7 @@
 import pygame
+
+from assets import assets
 from settings import *
-from pygame.image import load
 
 
 class MenuLayout:
@@ -17,9 +18,9 @@ class MenuLayout:
         for key, value in EDITOR_DATA.items():
             if value['menu']:
                 if not value['menu'] in self.menu_surfs:
-                    self.menu_surfs[value['menu']] = [(key, load(value['menu_surf']))]
+                    self.menu_surfs[value['menu']] = [(key, assets.load(value['menu_surf']))]
                 else:
-                    self.menu_surfs[value['menu']].append((key, load(value['menu_surf'])))
+                    self.menu_surfs[value['menu']].append((key, assets.load(value['menu_surf'])))
 
     def create_buttons(self):
         size = 100
@@ -66,9 +67,9 @@ class Menu:
         for key, value in EDITOR_DATA.items():
             if value['menu']:
                 if not value['menu'] in self.menu_surfs:
-                    self.menu_surfs[value['menu']] = [(key, load(value['menu_surf']))]
+                    self.menu_surfs[value['menu']] = [(key, assets.load(value['menu_surf']))]
                 else:
-                    self.menu_surfs[value['menu']].append((key, load(value['menu_surf'])))
+                    self.menu_surfs[value['menu']].append((key, assets.load(value['menu_surf'])))
 
     def create_buttons(self):
         size = 200
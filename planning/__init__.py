@@ -0,0 +1,18 @@
+from planning.cbs import solve_cbs
+from planning.clustering import BatAlgorithmClustering
+from planning.engine import GridEngine
+from planning.grid import get_helpers
+from planning.jobs import PlanningCancelled, PlanningJob
+from planning.parallel import plan_clusters
+from planning.planner import (
+    algorithm_options,
+    plan_paths,
+    plan_one_to_one,
+    plan_one_to_many,
+    plan_pso,
+    plan_many_to_many,
+    assign_clusters,
+)
+from planning.pso import find_path_pso
+from planning.reservation import ReservationTable, plan_cooperative
+from planning.search import find_path, get_search
@@ -0,0 +1,202 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from planning.engine import GridEngine
+from planning.grid import DIRECTIONS
+from planning.reservation import MAX_DELAY, WAIT_STEPS, plan_cooperative, route_stops
+
+# conflict tree nodes expanded and seconds spent before CBS hands over to prioritised planning
+NODE_LIMIT = 5000
+TIME_LIMIT = 10.0
+
+
+class Constraints:
+    # one robot's ('vertex', cell, t) and ('edge', cell, next_cell, t) constraints
+    def __init__(self, constraints):
+        self.vertices = {(c[1], c[2]) for c in constraints if c[0] == 'vertex'}
+        self.edges = {c[1:] for c in constraints if c[0] == 'edge'}
+        self.last_vertex = {}
+        for cell, t in self.vertices:
+            self.last_vertex[cell] = max(self.last_vertex.get(cell, -1), t)
+
+    def is_free(self, cell, t):
+        return (cell, t) not in self.vertices
+
+    def can_move(self, cell, next_cell, t):
+        return self.is_free(next_cell, t + 1) and (cell, next_cell, t) not in self.edges
+
+    def can_wait(self, cell, t, steps=WAIT_STEPS):
+        return all(self.is_free(cell, t + step) for step in range(1, steps + 1))
+
+    def can_park(self, cell, t):
+        return self.last_vertex.get(cell, -1) < t
+
+
+class Agent:
+    # A robot's start and stops, with a distance field per stop for the low level heuristic:
+    # the distance to the next stop plus everything still to drive and wait after it.
+    def __init__(self, engine, cells):
+        self.start = cells[0]
+        self.stops = route_stops(cells)
+        self.fields = [engine.distance_field(cell) for cell, _ in self.stops]
+        self.rest = [0] * (len(self.stops) + 1)
+        for k in range(len(self.stops) - 1, -1, -1):
+            self.rest[k] = self.stops[k][1] * WAIT_STEPS + self.rest[k + 1]
+            if k + 1 < len(self.stops):
+                self.rest[k] += self.fields[k + 1][self.stops[k][0]]
+
+    def heuristic(self, cell, k):
+        if k == len(self.stops):
+            return 0
+        return self.fields[k][cell] + self.rest[k]
+
+    def plan(self, constraints):
+        # time-expanded A* over (cell, t, next stop); returns [(cell, t), ...] up to where it parks
+        if not self.stops:
+            return [(self.start, 0)] if constraints.can_park(self.start, 0) else None
+        if self.heuristic(self.start, 0) < 0 or any(field[cell] < 0 for field, (cell, _) in
+                                                   zip(self.fields[1:], self.stops)):
+            return None
+
+        limit = self.heuristic(self.start, 0) + MAX_DELAY
+        rows, cols = self.fields[0].shape
+        start = (self.start, 0, 0)
+        heap = [(self.heuristic(self.start, 0), 0, self.start, 0)]
+        parents = {start: None}
+        while heap:
+            _, t, cell, k = heapq.heappop(heap)
+            if k == len(self.stops):
+                states = [(cell, t, k)]
+                while parents[states[-1]] is not None:
+                    states.append(parents[states[-1]])
+                return [(state[0], state[1]) for state in reversed(states)]
+
+            successors = []
+            if cell == self.stops[k][0]:
+                # reaching the stop: wait there as often as the route asks, park if it was the last
+                end = t + self.stops[k][1] * WAIT_STEPS
+                if constraints.can_wait(cell, t, end - t) and \
+                        (k + 1 < len(self.stops) or constraints.can_park(cell, end)):
+                    successors.append((cell, end, k + 1))
+            for direction in DIRECTIONS:
+                next_cell = (cell[0] + direction[0], cell[1] + direction[1])
+                if 0 <= next_cell[0] < rows and 0 <= next_cell[1] < cols and self.fields[k][next_cell] >= 0 and \
+                        constraints.can_move(cell, next_cell, t):
+                    successors.append((next_cell, t + 1, k))
+            if constraints.can_wait(cell, t):
+                successors.append((cell, t + WAIT_STEPS, k))
+
+            for state in successors:
+                if state[1] > limit or state in parents:
+                    continue
+                parents[state] = (cell, t, k)
+                heapq.heappush(heap, (state[1] + self.heuristic(state[0], state[2]), state[1], state[0], state[2]))
+
+        return None
+
+
+def timeline(timed):
+    # the robot's cell at every time step up to where it parks
+    cells = [timed[0][0]]
+    for (cell, t), (next_cell, next_t) in zip(timed, timed[1:]):
+        cells.extend([next_cell] * (next_t - t))
+    return cells
+
+
+def first_conflict(plans):
+    timelines = [timeline(plan) for plan in plans]
+    end = max(len(cells) for cells in timelines)
+    position = lambda i, t: timelines[i][min(t, len(timelines[i]) - 1)]
+
+    for t in range(end):
+        seen = {}
+        for i in range(len(plans)):
+            cell = position(i, t)
+            if cell in seen:
+                return ('vertex', seen[cell], i, cell, t)
+            seen[cell] = i
+
+        moves = {}
+        for i in range(len(plans)):
+            cell, next_cell = position(i, t), position(i, t + 1)
+            if cell == next_cell:
+                continue
+            if (next_cell, cell) in moves:
+                return ('edge', moves[(next_cell, cell)], i, next_cell, cell, t)
+            moves[(cell, next_cell)] = i
+    return None
+
+
+def branches(conflict):
+    if conflict[0] == 'vertex':
+        _, i, j, cell, t = conflict
+        return [(i, ('vertex', cell, t)), (j, ('vertex', cell, t))]
+    _, i, j, cell, next_cell, t = conflict
+    return [(i, ('edge', cell, next_cell, t)), (j, ('edge', next_cell, cell, t))]
+
+
+def to_points(timed):
+    # (x, y) points with a repeated point for every WAIT_STEPS spent in one cell
+    points = [timed[0][0]]
+    for (cell, t), (next_cell, next_t) in zip(timed, timed[1:]):
+        if next_cell != cell:
+            points.append(next_cell)
+        else:
+            points.extend([cell] * ((next_t - t) // WAIT_STEPS))
+    return np.array([(col, row) for row, col in points], dtype=np.int32)
+
+
+def solve_cbs(grid, paths, node_limit=NODE_LIMIT, time_limit=TIME_LIMIT, progress=None):
+    # Conflict-Based Search over the robots' stops from `paths` ((x, y) arrays, repeated points
+    # being waits). Conflict tree nodes are expanded cheapest total arrival time first; each
+    # branch adds one constraint to one robot, whose low level plans are cached per constraint set.
+    # When a robot cannot be planned on its own, or over node_limit nodes or time_limit seconds,
+    # the robots are planned with plan_cooperative instead, which is reported as a 'cbs' stage
+    # with fallback set.
+    engine = GridEngine(grid)
+    agents = [Agent(engine, [(int(y), int(x)) for x, y in path]) for path in paths]
+    cache = {}
+
+    def low_level(i, constraints):
+        if (i, constraints) not in cache:
+            cache[(i, constraints)] = agents[i].plan(Constraints(constraints))
+        return cache[(i, constraints)]
+
+    constraints = tuple(frozenset() for _ in agents)
+    plans = [low_level(i, constraints[i]) for i in range(len(agents))]
+    if any(plan is None for plan in plans):
+        if progress:
+            progress('cbs', fallback='prioritised', nodes=0)
+        return plan_cooperative(grid, paths, progress=progress)
+
+    started = time.perf_counter()
+    counter = itertools.count()
+    heap = [(sum(plan[-1][1] for plan in plans), next(counter), constraints, plans)]
+    expanded = 0
+    while heap:
+        cost, _, constraints, plans = heapq.heappop(heap)
+        conflict = first_conflict(plans)
+        if conflict is None:
+            return [to_points(plan) for plan in plans]
+
+        expanded += 1
+        if progress:
+            progress('cbs', nodes=expanded, cost=cost)
+        if expanded > node_limit or time.perf_counter() - started > time_limit:
+            if progress:
+                progress('cbs', fallback='prioritised', nodes=expanded)
+            return plan_cooperative(grid, paths, progress=progress)
+
+        for i, constraint in branches(conflict):
+            child_constraints = constraints[:i] + (constraints[i] | {constraint},) + constraints[i + 1:]
+            plan = low_level(i, child_constraints[i])
+            if plan is None:
+                continue
+            child_plans = plans[:i] + [plan] + plans[i + 1:]
+            heapq.heappush(heap, (sum(plan[-1][1] for plan in child_plans), next(counter),
+                                  child_constraints, child_plans))
+
+    raise ValueError("Unable to find a collision-free path for every robot.")
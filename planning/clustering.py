@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class BatAlgorithmClustering:
+    # All bats live in (bats, clusters, dims) arrays; one (bats, points, clusters) distance
+    # tensor scores the whole colony and each bat's fitness is cached until its position moves.
+    def __init__(self, coordinates, n_clusters, n_bats=20, n_iterations=100, f_min=0, f_max=2):
+        self.coordinates = np.array(coordinates, dtype=float)
+        self.n_clusters = n_clusters
+        self.n_bats = n_bats
+        self.n_iterations = n_iterations
+        self.f_min = f_min
+        self.f_max = f_max
+        self.lower = self.coordinates.min(axis=0)
+        self.upper = self.coordinates.max(axis=0)
+        self.point_norms = np.einsum('pd,pd->p', self.coordinates, self.coordinates)
+
+        self.initialize_bats()
+        best = self.fitness.argmin()
+        self.best_position = self.positions[best].copy()
+        self.best_fitness = self.fitness[best]
+
+    def distances(self, positions):
+        # (bats, points, clusters) euclidean distances between every point and every centroid
+        # |p - c|^2 = |p|^2 - 2 p.c + |c|^2 avoids materialising a (bats, points, clusters, dims) tensor
+        squared = (self.point_norms[None, :, None]
+                   - 2 * np.einsum('pd,bkd->bpk', self.coordinates, positions)
+                   + np.einsum('bkd,bkd->bk', positions, positions)[:, None, :])
+        return np.sqrt(np.maximum(squared, 0))
+
+    def evaluate_fitness(self, positions):
+        # sum of distances from each point to its closest centroid, one value per bat
+        return self.distances(positions).min(axis=2).sum(axis=1)
+
+    def assign_clusters(self, centroids):
+        labels = self.distances(centroids[None])[0].argmin(axis=1)
+        return [list(self.coordinates[labels == i]) for i in range(centroids.shape[0])]
+
+    def initialize_bats(self):
+        n_points, n_dim = self.coordinates.shape
+        if self.n_clusters > n_points:
+            raise ValueError("Not enough tables to give every robot a cluster.")
+
+        # every bat starts on n_clusters distinct points
+        picks = np.random.rand(self.n_bats, n_points).argsort(axis=1)[:, :self.n_clusters]
+        self.positions = self.coordinates[picks]
+        self.velocities = np.zeros((self.n_bats, self.n_clusters, n_dim))
+        self.frequencies = np.zeros(self.n_bats)
+        self.pulse_rates = np.random.rand(self.n_bats)
+        self.loudness = np.random.rand(self.n_bats)
+        self.fitness = self.evaluate_fitness(self.positions)
+
+    def update_bats(self):
+        self.frequencies = self.f_min + (self.f_max - self.f_min) * np.random.rand(self.n_bats)
+        self.velocities += (self.positions - self.best_position) * self.frequencies[:, None, None]
+        candidates = self.positions + self.velocities
+
+        local_walk = np.random.rand(self.n_bats) > self.pulse_rates
+        candidates[local_walk] += 0.01 * np.random.randn(local_walk.sum(), *self.positions.shape[1:])
+
+        candidates = np.clip(candidates, self.lower, self.upper)
+
+        candidate_fitness = self.evaluate_fitness(candidates)
+        accepted = (candidate_fitness < self.fitness) & (np.random.rand(self.n_bats) < self.loudness)
+        self.positions[accepted] = candidates[accepted]
+        self.fitness[accepted] = candidate_fitness[accepted]
+        self.loudness[accepted] *= 0.9
+        self.pulse_rates[accepted] *= 1 - np.exp(-0.1)
+
+    def run(self, progress=None):
+        for iteration in range(self.n_iterations):
+            self.update_bats()
+            best = self.fitness.argmin()
+            if self.fitness[best] < self.best_fitness:
+                self.best_fitness = self.fitness[best]
+                self.best_position = self.positions[best].copy()
+            if progress:
+                progress('clustering', iteration=iteration + 1, total=self.n_iterations, fitness=self.best_fitness)
+
+        # Get the final clusters based on the best bat's centroids
+        final_clusters = self.assign_clusters(self.best_position)
+        return self.best_position, final_clusters
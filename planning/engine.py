@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class GridEngine:
+    # Breadth-first wavefront search over a flat occupancy array. Every move costs the same,
+    # so a wavefront is also what Dijkstra would settle, one whole distance level at a time.
+    def __init__(self, grid):
+        self.rows, self.cols = len(grid), len(grid[0])
+        # a border of blocked cells keeps every neighbour offset inside the array
+        self.width = self.cols + 2
+        occupancy = np.zeros((self.rows + 2, self.width), dtype=np.uint8)
+        occupancy[1:-1, 1:-1] = np.asarray(grid) != 0
+        self.occupancy = occupancy.ravel()
+        # same order as planning.grid.DIRECTIONS
+        self.offsets = np.array([-self.width, self.width, 1, -1], dtype=np.int32)
+
+        self.distance = np.empty(self.occupancy.size, dtype=np.int32)
+        self.parent = np.empty(self.occupancy.size, dtype=np.int32)
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def expand(self, source, goals=None):
+        # fills distance/parent from source, stopping at the first level that reaches a goal
+        self.distance.fill(-1)
+        self.parent.fill(-1)
+        self.distance[source] = 0
+        frontier = np.array([source], dtype=np.int32)
+        step = 0
+
+        while frontier.size:
+            if goals is not None and (self.distance[goals] != -1).any():
+                break
+
+            step += 1
+            neighbours = (frontier[:, None] + self.offsets).ravel()
+            parents = np.repeat(frontier, len(self.offsets))
+
+            open_cells = (self.occupancy[neighbours] != 0) & (self.distance[neighbours] == -1)
+            neighbours = neighbours[open_cells]
+            parents = parents[open_cells]
+
+            # a cell reached from several parents keeps whichever write landed last
+            self.parent[neighbours] = parents
+            neighbours = neighbours[self.parent[neighbours] == parents]
+            self.distance[neighbours] = step
+            frontier = neighbours
+
+    def trace(self, goal):
+        indices = [goal]
+        while self.parent[indices[-1]] != -1:
+            indices.append(self.parent[indices[-1]])
+        rows, cols = np.divmod(np.array(indices[::-1], dtype=np.int32), self.width)
+        return np.stack([cols - 1, rows - 1], axis=1).astype(np.int32)
+
+    def find_path(self, start, end):
+        # same contract as PathfindingSearch.find_path
+        return self.find_path_to_any(start, [end])
+
+    def find_path_to_any(self, start, goals):
+        # one wavefront from start answers every goal, the nearest one (first listed on ties) wins
+        source = self.index(start)
+        goals = np.array([self.index(goal) for goal in goals], dtype=np.int32)
+        goals = goals[self.occupancy[goals] != 0]
+        if not self.occupancy[source] or not goals.size:
+            return np.empty((0, 2), dtype=np.int32)
+
+        self.expand(source, goals)
+        reached = goals[self.distance[goals] != -1]
+        if not reached.size:
+            return np.empty((0, 2), dtype=np.int32)
+        return self.trace(reached[self.distance[reached].argmin()])
+
+    def distance_field(self, source):
+        # (rows, cols) step counts from source, -1 where it can't be reached
+        self.expand(self.index(source))
+        return self.distance.reshape(self.rows + 2, self.width)[1:-1, 1:-1].copy()
+
+    def distances(self, source, cells):
+        # step counts from source to each cell, inf where it can't be reached
+        self.expand(self.index(source))
+        distances = self.distance[[self.index(cell) for cell in cells]].astype(float)
+        distances[distances == -1] = np.inf
+        return distances
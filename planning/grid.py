@@ -0,0 +1,16 @@
+DIRECTIONS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
+
+def get_helpers(target, grid):
+    helpers = []
+    for direction in DIRECTIONS:
+        helper = (target[0] + direction[0], target[1] + direction[1])
+        if 0 <= helper[0] < len(grid) and 0 <= helper[1] < len(grid[0]):
+            if grid[helper[0]][helper[1]] != 0:
+                helpers.append(helper)
+    return helpers
+
+
+def to_cell(coord):
+    # start coordinates come from the editor as (x, y), every other cell is (row, col)
+    return int(coord[1]), int(coord[0])
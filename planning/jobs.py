@@ -0,0 +1,58 @@
+import queue
+import threading
+
+
+class PlanningCancelled(Exception):
+    pass
+
+
+class PlanningJob:
+    # Runs a planner on a background thread. The planner gets the job's report() as its
+    # progress callback; report() queues the event for poll() and is also where a cancelled
+    # job stops, by raising PlanningCancelled inside the planner.
+    def __init__(self, planner, *args, **kwargs):
+        self.planner = planner
+        self.args = args
+        self.kwargs = kwargs
+
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+        self.result = None
+        self.error = None
+        self.progress = {}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            self.result = self.planner(*self.args, progress=self.report, **self.kwargs)
+        except Exception as e:
+            self.error = e
+
+    def report(self, stage, **values):
+        if self.cancel_event.is_set():
+            raise PlanningCancelled("Planning was cancelled.")
+        self.events.put(dict(stage=stage, **values))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def poll(self):
+        # drains queued progress events, returning the newest one (also kept in self.progress)
+        while True:
+            try:
+                self.progress = self.events.get_nowait()
+            except queue.Empty:
+                return self.progress
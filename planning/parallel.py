@@ -0,0 +1,55 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+POLL_INTERVAL = 0.05
+
+
+def plan_cluster(grid, start, cluster, planner, backend, seed, progress=None):
+    # runs in a worker process; the seed keeps PSO results the same whichever process runs it
+    from planning.planner import plan_one_to_many, plan_pso
+
+    np.random.seed(seed)
+    if planner == 'pso':
+        return plan_pso(grid, start, cluster, progress=progress)
+    return plan_one_to_many(grid, start, cluster, planner, backend, progress)
+
+
+def plan_clusters(grid, jobs, planner='astar', backend='pathfinding', workers=None, progress=None):
+    # jobs are (start, cluster) pairs, one per robot, planned independently of each other.
+    # workers=None uses every core, workers=1 plans serially in this process. progress gets a
+    # 'robots' report about every POLL_INTERVAL seconds while the pool works and after every robot.
+    seeds = np.random.randint(0, 2 ** 31 - 1, size=len(jobs))
+    tasks = [(grid, start, cluster, planner, backend, seed) for (start, cluster), seed in zip(jobs, seeds)]
+
+    if workers != 1 and len(tasks) > 1:
+        try:
+            return run_in_pool(tasks, workers, progress)
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Parallel planning unavailable, planning serially: {str(e)}")
+
+    paths = []
+    for task in tasks:
+        paths.append(plan_cluster(*task, progress))
+        if progress:
+            progress('robots', done=len(paths), total=len(tasks))
+    return paths
+
+
+def run_in_pool(tasks, workers, progress):
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(plan_cluster, *task) for task in tasks]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception():
+                    raise future.exception()
+            if progress:
+                progress('robots', done=len(tasks) - len(pending), total=len(tasks))
+        return [future.result() for future in futures]
+    finally:
+        # on an error or a cancelled progress report, queued robots are dropped instead of waited for
+        executor.shutdown(wait=False, cancel_futures=True)
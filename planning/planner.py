@@ -0,0 +1,143 @@
+import numpy as np
+
+from planning.cbs import solve_cbs
+from planning.clustering import BatAlgorithmClustering
+from planning.grid import get_helpers, to_cell
+from planning.parallel import plan_clusters
+from planning.pso import GridIndex, find_path_pso
+from planning.reservation import plan_cooperative
+from planning.search import get_search
+from planning.tour import distance_matrix, solve_tour
+
+
+def plan_one_to_one(grid, start, end, finder='bfs', backend='pathfinding'):
+    helpers = get_helpers(end, grid)
+
+    if not helpers:
+        raise ValueError("Unable to find a valid coordinate to go to.")
+
+    path = get_search(grid, finder, backend).find_path_to_any(start, helpers)
+    if not len(path):
+        raise ValueError("No path found from start to end coordinates.")
+
+    return path
+
+
+def plan_one_to_many(grid, start, targets, finder='astar', backend='pathfinding', progress=None):
+    all_helpers_combinations = [get_helpers(target, grid) for target in targets]
+
+    if not all_helpers_combinations or any(not helpers for helpers in all_helpers_combinations):
+        raise ValueError("Unable to find any valid helper coordinates for one or more targets.")
+
+    nodes, groups, matrix = distance_matrix(grid, start, all_helpers_combinations, progress)
+    tour, path_length = solve_tour(matrix, groups, progress)
+
+    if not np.isfinite(path_length):
+        raise ValueError("No valid paths were found.")
+
+    search = get_search(grid, finder, backend)
+    legs = []
+    current_point = start
+    for node in tour:
+        helper = nodes[node]
+        if helper == current_point:
+            # two tables served from the same cell, the robot just waits there once more
+            legs.append(np.array([(helper[1], helper[0])], dtype=np.int32))
+        else:
+            legs.append(search.find_path(current_point, helper))
+        current_point = helper
+
+    return np.concatenate(legs)
+
+
+def max_manhattan_distance(start, targets):
+    return max(abs(start[0] - target[0]) + abs(start[1] - target[1]) for target in targets)
+
+
+def plan_pso(grid, start, targets, max_iterations=5, progress=None):
+    max_waypoint = len(grid) * len(grid[0])
+    min_waypoint = max_manhattan_distance(start, targets)
+    best_path = find_path_pso(grid, [(start[1], start[0])], targets, min_waypoint, max_waypoint, max_iterations,
+                              progress=progress)
+    return np.asarray(best_path, dtype=np.int32)
+
+
+def assign_clusters(starts, centroids):
+    from scipy.optimize import linear_sum_assignment
+
+    starts = np.asarray(starts, dtype=float)
+    centroids = np.asarray(centroids, dtype=float)
+    dist_matrix = np.linalg.norm(starts[:, None, :] - centroids[None, :, :], axis=2)
+
+    row_ind, col_ind = linear_sum_assignment(dist_matrix)
+
+    return {cluster_idx: start_idx for start_idx, cluster_idx in zip(row_ind, col_ind)}
+
+
+def plan_many_to_many(grid, starts, targets, planner='astar', backend='pathfinding', workers=None, progress=None,
+                      solver='prioritised'):
+    bat_clustering = BatAlgorithmClustering(targets, len(starts))
+    centroids, clusters = bat_clustering.run(progress)
+    assignment = assign_clusters(starts, centroids)
+
+    jobs = [(starts[assignment[i]], [tuple(int(value) for value in target) for target in cluster])
+            for i, cluster in enumerate(clusters)]
+    paths = [None] * len(starts)
+    for i, path in enumerate(plan_clusters(grid, jobs, planner, backend, workers, progress)):
+        paths[assignment[i]] = path
+
+    # the robots were planned independently, now they are planned around each other; PSO routes
+    # are kept cell by cell, A* tours keep their table stops and may take other ways between them.
+    # solver 'cbs' searches the conflicts between the robots instead of planning them in turn
+    planned = [i for i, path in enumerate(paths) if path is not None]
+    if solver == 'cbs':
+        coordinated = solve_cbs(grid, [paths[i] for i in planned], progress=progress)
+    else:
+        visits = None
+        if planner == 'pso':
+            # where each route passes its tables, kept should the routes have to be planned again
+            tables = {start: jobs[cluster][1] for cluster, start in assignment.items()}
+            visits = [GridIndex(grid, [(y, x) for x, y in tables[i]]).target_visits(paths[i]) for i in planned]
+        coordinated = plan_cooperative(grid, [paths[i] for i in planned], planner == 'pso', progress, visits)
+    for i, path in zip(planned, coordinated):
+        paths[i] = path
+    return paths
+
+
+def algorithm_options(start_count, end_count):
+    # [label, algorithm] pairs offered for a layout, in the order Layout.choose_algorithm_popup shows them
+    if start_count == 1 and end_count == 1:
+        return [['BFS', 'BFS 1to1'], ['Dijkstra', 'Dijkstra 1to1'], ['A*', 'A* 1to1'], ['PSO', 'PSO']]
+    if start_count == 1 and end_count > 1:
+        return [['Dijkstra', 'Dijkstra 1toMany'], ['A*', 'A* 1toMany'], ['PSO', 'PSO']]
+    return [['A* with pause', 'A* ManytoManyP'], ['CBS', 'CBS ManytoMany'], ['PSO', 'PSO ManytoMany']]
+
+
+def plan_paths(algorithm, grid, start_coords, end_coords, backend='pathfinding', workers=None, progress=None):
+    # start_coords are (x, y) and end_coords (row, col), as written by Editor.create_grid;
+    # one (x, y) path array is returned per start, None where a start got nothing to do.
+    # workers only applies to the ManytoMany modes, see planning.parallel.plan_clusters.
+    # progress(stage, **values) is called as planning goes on; see planning.jobs.PlanningJob
+    starts = [to_cell(start) for start in start_coords]
+    targets = [tuple(end) for end in end_coords]
+
+    if algorithm == 'BFS 1to1':
+        return [plan_one_to_one(grid, starts[0], targets[0], 'bfs', backend)]
+    if algorithm == 'Dijkstra 1to1':
+        return [plan_one_to_one(grid, starts[0], targets[0], 'dijkstra', backend)]
+    if algorithm == 'A* 1to1':
+        return [plan_one_to_one(grid, starts[0], targets[0], 'astar', backend)]
+    if algorithm == 'Dijkstra 1toMany':
+        return [plan_one_to_many(grid, starts[0], targets, 'dijkstra', backend, progress)]
+    if algorithm == 'A* 1toMany':
+        return [plan_one_to_many(grid, starts[0], targets, 'astar', backend, progress)]
+    if algorithm == 'PSO':
+        return [plan_pso(grid, starts[0], targets, progress=progress)]
+    if algorithm == 'A* ManytoManyP':
+        return plan_many_to_many(grid, starts, targets, 'astar', backend, workers, progress)
+    if algorithm == 'CBS ManytoMany':
+        return plan_many_to_many(grid, starts, targets, 'astar', backend, workers, progress, 'cbs')
+    if algorithm == 'PSO ManytoMany':
+        return plan_many_to_many(grid, starts, targets, 'pso', backend, workers, progress)
+
+    raise ValueError(f"Unknown algorithm: {algorithm}")
@@ -0,0 +1,217 @@
+import numpy as np
+
+# (x, y) steps, in the order the repair step prefers them on equal distance
+MOVES = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
+DIRECTIONS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+# share of a new swarm started from the previous round's best path
+SEED_FRACTION = 0.25
+# default patience of a swarm as a share of its iterations, and the fewest stalled iterations
+# that stop it
+PATIENCE_SHARE = 0.2
+MIN_PATIENCE = 2
+# swarm size per waypoint, capped so long paths don't grow the swarm arrays quadratically
+PARTICLES_PER_WAYPOINT = 50
+MAX_PARTICLES = 1000
+
+
+class GridIndex:
+    # Occupancy and target lookups shared by everything in a PSO run. Cells are (x, y) and
+    # are also encoded as y * width + x so whole paths can be matched against target sides.
+    def __init__(self, grid, targets):
+        self.blocked = np.asarray(grid) == 0
+        self.height, self.width = self.blocked.shape
+        self.targets = np.array(targets, dtype=int).reshape(-1, 2)
+
+        # (targets, 4, 2) cells around every target and a mask of the sides that can be driven to
+        self.helper_cells = self.targets[:, None, :] + np.array(DIRECTIONS)
+        self.helper_mask = self.is_free(self.helper_cells)
+        self.helper_ids = np.where(self.helper_mask, self.cell_id(self.helper_cells), -1)
+
+    def inside(self, cells):
+        return (cells[..., 0] >= 0) & (cells[..., 0] < self.width) & \
+               (cells[..., 1] >= 0) & (cells[..., 1] < self.height)
+
+    def is_blocked(self, cells):
+        # cells must be inside the grid
+        return self.blocked[cells[..., 1], cells[..., 0]]
+
+    def is_free(self, cells):
+        clipped = np.clip(cells, 0, [self.width - 1, self.height - 1])
+        return self.inside(cells) & ~self.is_blocked(clipped)
+
+    def cell_id(self, cells):
+        return cells[..., 1] * self.width + cells[..., 0]
+
+    def visited_targets(self, path):
+        # (targets,) flags for targets with at least one free side on the path
+        on_path = np.isin(self.helper_ids, self.cell_id(path))
+        return (on_path & self.helper_mask).any(axis=1)
+
+    def target_visits(self, path):
+        # indices of the points where the path first reaches a free side of each target
+        ids = self.cell_id(path)
+        visits = set()
+        for helper_ids, mask in zip(self.helper_ids, self.helper_mask):
+            hits = np.flatnonzero(np.isin(ids, helper_ids[mask]))
+            if len(hits):
+                visits.add(int(hits[0]))
+        return sorted(visits)
+
+    def last_target_index(self, path):
+        # the latest first visit of any free target side along the path
+        ids = self.cell_id(path)
+        helper_ids = np.unique(self.helper_ids[self.helper_mask])
+        helper_ids = helper_ids[np.isin(helper_ids, ids)]
+        first_visits = [np.flatnonzero(ids == helper_id)[0] for helper_id in helper_ids]
+        return max(first_visits)
+
+
+class Swarm:
+    # Every particle is a path of num_waypoints steps from the start. Positions, velocities and
+    # personal bests are (particles, waypoints + 1, 2) arrays of (x, y) cells, updated together.
+    def __init__(self, start, index, num_waypoints, num_particles, seed_path=None):
+        self.start = np.array(start)
+        self.index = index
+        self.targets = index.targets.astype(float)
+        self.grid_height, self.grid_width = index.height, index.width
+        self.num_waypoints = num_waypoints
+        self.num_particles = num_particles
+        self.c1 = 2.0
+        self.c2 = 2.0
+        self.w = 0.5
+
+        self.position = self.initialize_paths(seed_path)
+        self.velocity = np.random.uniform(-1, 1, self.position.shape)
+        self.fitness_values = self.fitness(self.position)
+        self.best_position = self.position.copy()
+        self.best_fitness = self.fitness_values.copy()
+
+        best = self.best_fitness.argmin()
+        self.global_best_position = self.best_position[best].copy()
+        self.global_best_fitness = self.best_fitness[best]
+
+    def free_moves(self, positions):
+        # the four neighbours of every position and whether each one can be driven onto
+        moves = positions[:, None, :] + MOVES
+        return moves, self.index.is_free(moves)
+
+    def initialize_paths(self, seed_path=None):
+        # random walks from the start; a particle boxed in on every side stays where it is.
+        # With a seed_path, the first SEED_FRACTION of the swarm replays it and walks on from its end.
+        path = np.empty((self.num_particles, self.num_waypoints + 1, 2), dtype=int)
+        path[:, 0] = self.start
+        seeded = np.zeros(self.num_particles, dtype=bool)
+        if seed_path is not None:
+            seeded[:max(1, int(self.num_particles * SEED_FRACTION))] = True
+            seed_path = seed_path[:self.num_waypoints + 1]
+
+        for i in range(1, self.num_waypoints + 1):
+            moves, free = self.free_moves(path[:, i - 1])
+            choice = np.where(free, np.random.rand(*free.shape), -1).argmax(axis=1)
+            stuck = ~free.any(axis=1)
+            path[:, i] = moves[np.arange(self.num_particles), choice]
+            path[stuck, i] = path[stuck, i - 1]
+            if seed_path is not None and i < len(seed_path):
+                path[seeded, i] = seed_path[i]
+        return path
+
+    def fitness(self, positions):
+        # closest approach to every target, infinite for paths that cross walls or tables;
+        # one target at a time keeps this at (particles, waypoints) whatever the number of targets
+        distance_cost = np.zeros(len(positions))
+        for target in self.targets:
+            distance_cost += np.linalg.norm(positions - target, axis=2).min(axis=1)
+        crosses_obstacle = self.index.is_blocked(positions).any(axis=1)
+        return np.where(crosses_obstacle, np.inf, distance_cost)
+
+    def enforce_adjacency(self):
+        # each waypoint depends on the repaired one before it, so this walks along the path
+        # while handling the whole swarm at once
+        for i in range(1, self.num_waypoints + 1):
+            previous_position = self.position[:, i - 1]
+            current_position = self.position[:, i]
+            adjacent = np.abs(current_position - previous_position).sum(axis=1) == 1
+
+            moves, free = self.free_moves(previous_position)
+            distances = np.linalg.norm(moves - current_position[:, None, :], axis=2)
+            distances[~free] = np.inf
+            choice = distances.argmin(axis=1)
+
+            repair = ~adjacent & free.any(axis=1)
+            self.position[repair, i] = moves[repair, choice[repair]]
+
+    def update(self):
+        r1 = np.random.rand(self.num_particles, 1, 1)
+        r2 = np.random.rand(self.num_particles, 1, 1)
+        self.velocity = (self.w * self.velocity +
+                         self.c1 * r1 * (self.best_position - self.position) +
+                         self.c2 * r2 * (self.global_best_position - self.position))
+        self.position = np.round(self.position + self.velocity).astype(int)
+
+        self.position[:, 1:] = np.clip(self.position[:, 1:], 0, [self.grid_width - 1, self.grid_height - 1])
+        self.position[:, 0] = self.start
+
+        self.enforce_adjacency()
+
+        self.fitness_values = self.fitness(self.position)
+        improved = self.fitness_values < self.best_fitness
+        self.best_fitness[improved] = self.fitness_values[improved]
+        self.best_position[improved] = self.position[improved]
+
+        best = self.best_fitness.argmin()
+        if self.best_fitness[best] < self.global_best_fitness:
+            self.global_best_fitness = self.best_fitness[best]
+            self.global_best_position = self.best_position[best].copy()
+
+    def run(self, max_iterations, patience=None, progress=None):
+        # stops early once the global best hasn't improved for `patience` iterations
+        stalled = 0
+        for iteration in range(max_iterations):
+            previous_best = self.global_best_fitness
+            self.update()
+            if progress:
+                progress('pso', waypoints=self.num_waypoints, iteration=iteration + 1,
+                         fitness=self.global_best_fitness)
+            stalled = stalled + 1 if self.global_best_fitness >= previous_best else 0
+            if patience and stalled >= patience:
+                break
+        return self.global_best_position, self.global_best_fitness
+
+
+def find_path_pso(grid, start, targets, initial_max_waypoints=2, max_waypoints=5, max_iterations=100,
+                  growth=1.5, patience=None, stall_rounds=3, progress=None):
+    # Waypoints grow geometrically between rounds and every new swarm is seeded with the previous
+    # best path, so a failing search costs O(log(max / initial)) rounds. The search gives up early
+    # once the best fitness hasn't improved for stall_rounds rounds in a row. A swarm stops once
+    # its best hasn't improved for `patience` iterations, by default a share of max_iterations.
+    if patience is None:
+        patience = max(MIN_PATIENCE, int(np.ceil(max_iterations * PATIENCE_SHARE)))
+    num_waypoints = initial_max_waypoints
+    found_path = False
+    index = GridIndex(grid, [(y, x) for x, y in targets])
+    global_best_position = None
+    best_fitness = np.inf
+    stalled = 0
+
+    while not found_path and num_waypoints <= max_waypoints and stalled < stall_rounds:
+        print(f"Searching with {num_waypoints} waypoints...")
+
+        num_particles = min(PARTICLES_PER_WAYPOINT * num_waypoints, MAX_PARTICLES)
+        swarm = Swarm(start[0], index, num_waypoints, num_particles, global_best_position)
+        global_best_position, global_best_fitness = swarm.run(max_iterations, patience, progress)
+        print("Fitness:", global_best_fitness)
+
+        found_path = index.visited_targets(global_best_position).all()
+
+        stalled = stalled + 1 if global_best_fitness >= best_fitness else 0
+        best_fitness = min(best_fitness, global_best_fitness)
+
+        if not found_path:
+            if num_waypoints == max_waypoints:
+                break
+            num_waypoints = min(max_waypoints, max(num_waypoints + 1, int(np.ceil(num_waypoints * growth))))
+
+    if not found_path:
+        raise ValueError("No path found with the given waypoints limit.")
+
+    return global_best_position[:index.last_target_index(global_best_position) + 1]
@@ -0,0 +1,169 @@
+import heapq
+
+import numpy as np
+
+from planning.engine import GridEngine
+from planning.grid import DIRECTIONS
+
+# one-tile moves a repeated point holds a robot for; Robot.pause_time is worked out from it
+WAIT_STEPS = 5
+# steps a leg may take beyond its shortest length while it waits or detours for other robots
+MAX_DELAY = 100
+
+
+class ReservationTable:
+    # Space-time bookings of the robots planned so far. Cells are booked per time step, moves are
+    # kept as (from, to, t) to catch two robots swapping cells, and a robot that has finished
+    # parks on its last cell for good. Robots not planned yet count as parked on their start.
+    def __init__(self):
+        self.cells = set()
+        self.moves = set()
+        self.parked = {}
+        self.last_booked = {}
+
+    def is_free(self, cell, t):
+        return (cell, t) not in self.cells and not (cell in self.parked and t >= self.parked[cell])
+
+    def can_move(self, cell, next_cell, t):
+        return self.is_free(next_cell, t + 1) and (next_cell, cell, t) not in self.moves
+
+    def can_wait(self, cell, t, steps=WAIT_STEPS):
+        return all(self.is_free(cell, t + step) for step in range(1, steps + 1))
+
+    def can_park(self, cell, t):
+        # nobody may come through a cell once a robot has stopped on it
+        return self.last_booked.get(cell, -1) < t
+
+    def park(self, cell, t):
+        self.parked[cell] = t
+
+    def unpark(self, cell):
+        self.parked.pop(cell, None)
+
+    def book(self, cell, t):
+        self.cells.add((cell, t))
+        self.last_booked[cell] = max(self.last_booked.get(cell, -1), t)
+
+    def reserve(self, timed_path):
+        # timed_path is [(cell, t), ...] from the start to where the robot parks
+        self.book(*timed_path[0])
+        for (cell, t), (next_cell, next_t) in zip(timed_path, timed_path[1:]):
+            if next_cell != cell:
+                self.moves.add((cell, next_cell, t))
+            for step in range(t + 1, next_t + 1):
+                self.book(next_cell, step)
+        self.park(*timed_path[-1])
+
+
+def plan_leg(engine, table, start, t0, goal, waits=0, final=False):
+    # space-time A* from start at t0 to goal, with one-tile moves and WAIT_STEPS long waits.
+    # The goal only counts once the robot can also wait there `waits` times, or park for good
+    # if it is the final one. Returns [(cell, t), ...] from (start, t0) to the arrival.
+    field = engine.distance_field(goal)
+    if field[start] < 0:
+        return None
+    limit = t0 + field[start] + MAX_DELAY
+    rows, cols = field.shape
+
+    heap = [(t0 + field[start], t0, start)]
+    parents = {(start, t0): None}
+    while heap:
+        _, t, cell = heapq.heappop(heap)
+        if cell == goal and table.can_wait(cell, t, waits * WAIT_STEPS) and (not final or table.can_park(cell, t)):
+            leg = [(cell, t)]
+            while parents[leg[-1]] is not None:
+                leg.append(parents[leg[-1]])
+            return leg[::-1]
+
+        successors = []
+        for direction in DIRECTIONS:
+            next_cell = (cell[0] + direction[0], cell[1] + direction[1])
+            if 0 <= next_cell[0] < rows and 0 <= next_cell[1] < cols and field[next_cell] >= 0 and \
+                    table.can_move(cell, next_cell, t):
+                successors.append((next_cell, t + 1))
+        if table.can_wait(cell, t):
+            successors.append((cell, t + WAIT_STEPS))
+
+        for next_cell, next_t in successors:
+            if next_t > limit or (next_cell, next_t) in parents:
+                continue
+            parents[(next_cell, next_t)] = (cell, t)
+            heapq.heappush(heap, (next_t + field[next_cell], next_t, next_cell))
+
+    return None
+
+
+def route_stops(cells, keep_route=False, keep=()):
+    # (cell, waits) stops after the start: every point with keep_route, otherwise only the points
+    # a robot waits at (repeated points, e.g. tables it serves), the points indexed in `keep`
+    # and the last one
+    stops = []
+    for i in range(1, len(cells)):
+        if cells[i] == cells[i - 1]:
+            if stops and stops[-1][0] == cells[i]:
+                stops[-1] = (cells[i], stops[-1][1] + 1)
+            else:
+                stops.append((cells[i], 1))
+        elif keep_route or i in keep or i == len(cells) - 1 or cells[i + 1] == cells[i]:
+            stops.append((cells[i], 0))
+    return stops
+
+
+def plan_in_order(engine, paths, order, keep_route, visits, progress):
+    # plans the robots in `order`, returning (planned, None) or (None, the robot that got stuck)
+    table = ReservationTable()
+    planned = [None] * len(paths)
+    for path in paths:
+        table.park((int(path[0][1]), int(path[0][0])), 0)
+
+    for done, i in enumerate(order, start=1):
+        cells = [(int(y), int(x)) for x, y in paths[i]]
+        stops = route_stops(cells, keep_route, visits[i] if visits else ())
+        table.unpark(cells[0])
+        if not stops and not table.can_park(cells[0], 0):
+            return None, i
+        timed = [(cells[0], 0)]
+        for n, (goal, waits) in enumerate(stops):
+            cell, t = timed[-1]
+            leg = plan_leg(engine, table, cell, t, goal, waits, final=n == len(stops) - 1)
+            if leg is None:
+                return None, i
+            timed.extend(leg[1:])
+            for _ in range(waits):
+                timed.append((goal, timed[-1][1] + WAIT_STEPS))
+
+        table.reserve(timed)
+        planned[i] = np.array([(col, row) for (row, col), _ in timed], dtype=np.int32)
+        if progress:
+            progress('schedule', done=done, total=len(paths))
+    return planned, None
+
+
+def plan_cooperative(grid, paths, keep_route=False, progress=None, visits=None):
+    # Prioritised planning: robots are planned one after the other, longest path first, and every
+    # robot books its cells in a ReservationTable that all later robots plan around. Each robot
+    # keeps its stops from `paths` ((x, y) arrays, repeated points being waits) in the same order;
+    # the moves between them are planned again in space and time, and waits the schedule needs
+    # come out as repeated points too. keep_route keeps every point of a path as a stop, and
+    # visits (point indices per path, e.g. where a PSO route passes its tables) keeps those.
+    # Robots wait on their start until they are planned, so one whose stops are stuck behind the
+    # start of a later robot is planned again after that robot. Routes that still cannot all be
+    # kept are planned again between their visits.
+    engine = GridEngine(grid)
+    order = sorted(range(len(paths)), key=lambda i: -len(paths[i]))
+    for _ in range(len(paths)):
+        planned, stuck = plan_in_order(engine, paths, order, keep_route, visits, progress)
+        if stuck is None:
+            return planned
+        stop_cells = {(int(x), int(y)) for x, y in paths[stuck][1:]}
+        later = order[order.index(stuck) + 1:]
+        blocking = [i for i in later if (int(paths[i][0][0]), int(paths[i][0][1])) in stop_cells]
+        if not blocking:
+            break
+        position = order.index(stuck)
+        order = order[:position] + blocking + [i for i in order[position:] if i not in blocking]
+
+    if keep_route and visits is not None:
+        # the routes cannot all be driven as they are, plan the moves between the visits again
+        return plan_cooperative(grid, paths, progress=progress, visits=visits)
+    raise ValueError("Unable to find a collision-free path for every robot.")
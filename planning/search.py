@@ -0,0 +1,52 @@
+import numpy as np
+from pathfinding.core.grid import Grid
+from pathfinding.finder.a_star import AStarFinder
+from pathfinding.finder.breadth_first import BreadthFirstFinder
+from pathfinding.finder.dijkstra import DijkstraFinder
+
+from planning.engine import GridEngine
+
+FINDERS = {
+    'bfs': BreadthFirstFinder,
+    'dijkstra': DijkstraFinder,
+    'astar': AStarFinder,
+}
+
+BACKENDS = ('pathfinding', 'native')
+
+
+class PathfindingSearch:
+    def __init__(self, grid, finder='astar'):
+        self.grid = Grid(matrix=grid)
+        self.finder = FINDERS[finder]()
+        self.engine = GridEngine(grid)
+
+    def find_path(self, start, end):
+        # start and end are (row, col) cells, the returned path is an (N, 2) array of (x, y) points
+        start_node = self.grid.node(start[1], start[0])
+        end_node = self.grid.node(end[1], end[0])
+        path, _ = self.finder.find_path(start_node, end_node, self.grid)
+        self.grid.cleanup()
+        return np.array([(node.x, node.y) for node in path], dtype=np.int32).reshape(-1, 2)
+
+    def find_path_to_any(self, start, goals):
+        # the finders only take a single end node, so one engine wavefront picks the nearest
+        # reachable goal and the finder is run once towards it
+        nearest = self.engine.find_path_to_any(start, goals)
+        if not len(nearest):
+            return nearest
+        return self.find_path(start, (nearest[-1][1], nearest[-1][0]))
+
+
+def get_search(grid, finder='astar', backend='pathfinding'):
+    # the native engine answers bfs, dijkstra and astar with the same wavefront,
+    # all of them return a shortest path on the unit-cost grid
+    if backend == 'native':
+        return GridEngine(grid)
+    if backend == 'pathfinding':
+        return PathfindingSearch(grid, finder)
+    raise ValueError(f"Unknown planning backend: {backend}")
+
+
+def find_path(grid, start, end, finder='astar', backend='pathfinding'):
+    return get_search(grid, finder, backend).find_path(start, end)
@@ -0,0 +1,242 @@
+import time
+
+import numpy as np
+
+from planning.engine import GridEngine
+
+HELD_KARP_LIMIT = 12
+# Held-Karp masks between progress reports
+REPORT_EVERY = 1024
+# local search limits for tours too long for Held-Karp
+MAX_PASSES = 100
+TIME_LIMIT = 10.0
+SEED = 7
+# smallest tour change that counts as an improvement
+EPSILON = 1e-9
+# distance to the node padding the helper lists, longer than any tour
+FAR = 1e12
+
+
+def distance_matrix(grid, start, helper_groups, progress=None):
+    # node 0 is the start, every unique helper cell gets one node shared by all the groups it serves
+    nodes = [start]
+    for helpers in helper_groups:
+        for helper in helpers:
+            if helper not in nodes:
+                nodes.append(helper)
+    groups = [[nodes.index(helper) for helper in helpers] for helpers in helper_groups]
+
+    engine = GridEngine(grid)
+    matrix = np.zeros((len(nodes), len(nodes)))
+    # moves are symmetric, so a field per helper also gives the distances back to the start
+    for i, node in enumerate(nodes[1:], start=1):
+        matrix[i] = engine.distances(node, nodes)
+        if progress:
+            progress('distances', done=i, total=len(nodes) - 1)
+    matrix[0] = matrix[:, 0]
+
+    return nodes, groups, matrix
+
+
+def held_karp(matrix, groups, progress=None):
+    # exact open tour from node 0 visiting one node of every group, O(2^k * n^2);
+    # DP slots are (group, node) pairs so a cell shared by two groups is tracked per group
+    k = len(groups)
+    slot_node = np.array([node for group in groups for node in group])
+    slot_bit = np.array([1 << g for g, group in enumerate(groups) for _ in group])
+    slot_matrix = matrix[np.ix_(slot_node, slot_node)]
+
+    cost = np.full((1 << k, len(slot_node)), np.inf)
+    parent = np.full((1 << k, len(slot_node)), -1)
+    cost[slot_bit, np.arange(len(slot_node))] = matrix[0, slot_node]
+
+    for mask in range(1, 1 << k):
+        if progress and mask % REPORT_EVERY == 0:
+            progress('tour', done=mask, total=1 << k)
+        row = cost[mask]
+        if not np.isfinite(row).any():
+            continue
+        arrival = row[:, None] + slot_matrix
+        best_from = arrival.argmin(axis=0)
+        best_cost = arrival.min(axis=0)
+
+        slots = np.flatnonzero((slot_bit & mask) == 0)
+        next_masks = mask | slot_bit[slots]
+        better = best_cost[slots] < cost[next_masks, slots]
+        cost[next_masks[better], slots[better]] = best_cost[slots][better]
+        parent[next_masks[better], slots[better]] = best_from[slots][better]
+
+    mask = (1 << k) - 1
+    slot = int(cost[mask].argmin())
+    total = cost[mask, slot]
+
+    tour = []
+    while slot != -1:
+        tour.append(int(slot_node[slot]))
+        slot, mask = int(parent[mask, slot]), mask & ~slot_bit[slot]
+    tour.reverse()
+
+    return tour, total
+
+
+def order_cost(matrix, groups, order):
+    # cheapest choice of one node per group for a fixed visiting order
+    cost = matrix[0, groups[order[0]]]
+    choices = []
+    for previous, current in zip(order, order[1:]):
+        arrival = cost[:, None] + matrix[np.ix_(groups[previous], groups[current])]
+        choices.append(arrival.argmin(axis=0))
+        cost = arrival.min(axis=0)
+
+    best = int(cost.argmin())
+    tour = [groups[order[-1]][best]]
+    for g, choice in zip(reversed(order[:-1]), reversed(choices)):
+        best = int(choice[best])
+        tour.append(groups[g][best])
+    tour.reverse()
+
+    return tour, cost.min()
+
+
+def nearest_neighbour_order(matrix, groups):
+    order = []
+    unvisited = set(range(len(groups)))
+    current = 0
+    while unvisited:
+        g, node = min(((g, node) for g in unvisited for node in groups[g]), key=lambda item: matrix[current, item[1]])
+        order.append(g)
+        unvisited.remove(g)
+        current = node
+    return order
+
+
+def pick_helpers(closed, options, before, after):
+    # cheapest of the `options` nodes (..., helpers) to put between `before` and `after`,
+    # returning the detour through it and the node
+    detours = closed[np.asarray(before)[..., None], options] + closed[options, np.asarray(after)[..., None]]
+    choice = detours.argmin(axis=-1)
+    return detours.min(axis=-1), np.take_along_axis(options, choice[..., None], axis=-1)[..., 0]
+
+
+def local_search(matrix, groups, order, passes, deadline, progress=None):
+    # 2-opt segment reversals and Or-opt moves of 1-3 groups until neither finds a shorter tour.
+    # Moves are scored by how much they change the tour, with only the groups at the ends of the
+    # moved part picking their helper again, and order_cost picks every helper again after a pass.
+    # Returns the order, its cost and the passes left.
+    tour, best_cost = order_cost(matrix, groups, order)
+    # an extra node at zero distance from all others closes the open tour, so the last edge of
+    # the tour is scored like any other, and one far from all others pads the helper lists
+    n = len(matrix)
+    end, far = n, n + 1
+    closed = np.full((n + 2, n + 2), FAR)
+    closed[:n + 1, :n + 1] = 0
+    closed[:n, :n] = matrix
+    helpers = np.full((len(groups), max(len(group) for group in groups)), far)
+    for g, group in enumerate(groups):
+        helpers[g, :len(group)] = group
+    k = len(order)
+
+    improved = True
+    while improved and passes > 0 and time.perf_counter() < deadline:
+        improved = False
+        passes -= 1
+        previous_order = order
+        # path[0] is the start, path[1:k + 1] the tour's nodes in order
+        path = np.array([0] + tour + [end])
+        order = np.array(order)
+
+        for i in range(1, k):
+            if progress:
+                progress('tour', passes_left=passes, move='2-opt', done=i, total=k, cost=best_cost)
+            # reverse path[i:j + 1], after which its new ends may pick other helpers
+            j = np.arange(i + 1, k + 1)
+            change = closed[path[i - 1], path[j]] + closed[path[i], path[j + 1]] - \
+                closed[path[i - 1], path[i]] - closed[path[j], path[j + 1]]
+            front_cost, front = pick_helpers(closed, helpers[order[j - 1]], path[i - 1], path[j - 1])
+            back_cost, back = pick_helpers(closed, helpers[order[[i - 1]]], path[i + 1], path[j + 1])
+            # two groups swapping places are next to each other, their helpers stay as they are
+            apart = j > i + 1
+            change += np.where(apart, front_cost - closed[path[i - 1], path[j]] - closed[path[j], path[j - 1]], 0)
+            change += np.where(apart, back_cost - closed[path[i + 1], path[i]] - closed[path[i], path[j + 1]], 0)
+            best = int(change.argmin())
+            if change[best] < -EPSILON:
+                j = int(j[best])
+                path[i:j + 1] = path[i:j + 1][::-1]
+                order[i - 1:j] = order[i - 1:j][::-1]
+                if apart[best]:
+                    path[i], path[j] = front[best], back[best]
+                improved = True
+
+        for length in (1, 2, 3):
+            for i in range(1, k - length + 2):
+                if progress:
+                    progress('tour', passes_left=passes, move=f'or-opt {length}', done=i, total=k, cost=best_cost)
+                # move path[i:last + 1] in between two nodes of the rest of the path, its first
+                # and last group picking the helpers that suit their new neighbours best
+                last = i + length - 1
+                segment = path[i:last + 1]
+                rest = np.concatenate([path[:i], path[last + 1:]])
+                removed = closed[path[i - 1], path[i]] + closed[path[last], path[last + 1]] - \
+                    closed[path[i - 1], path[last + 1]]
+                first_options = np.broadcast_to(helpers[order[i - 1]], (len(rest) - 1, helpers.shape[1]))
+                if length == 1:
+                    added, first = pick_helpers(closed, first_options, rest[:-1], rest[1:])
+                    last_node = first
+                elif length == 2:
+                    # both ends are next to each other, so their helpers are picked as a pair
+                    first_group, last_group = helpers[order[i - 1]], helpers[order[last - 1]]
+                    detours = closed[rest[:-1]][:, first_group][:, :, None] + \
+                        closed[np.ix_(first_group, last_group)][None] + closed[last_group][:, rest[1:]].T[:, None, :]
+                    detours = detours.reshape(len(detours), -1)
+                    choice = detours.argmin(axis=1)
+                    added = detours.min(axis=1) - closed[segment[0], segment[1]]
+                    first, last_node = first_group[choice // len(last_group)], last_group[choice % len(last_group)]
+                else:
+                    last_options = np.broadcast_to(helpers[order[last - 1]], first_options.shape)
+                    added, first = pick_helpers(closed, first_options, rest[:-1], segment[1])
+                    last_cost, last_node = pick_helpers(closed, last_options, segment[-2], rest[1:])
+                    added += last_cost - closed[segment[0], segment[1]] - closed[segment[-2], segment[-1]]
+                change = added - closed[rest[:-1], rest[1:]] - removed
+                best = int(change.argmin())
+                if change[best] < -EPSILON:
+                    segment = segment.copy()
+                    segment[0], segment[-1] = first[best], last_node[best]
+                    path = np.concatenate([rest[:best + 1], segment, rest[best + 1:]])
+                    kept = np.concatenate([order[:i - 1], order[last:]])
+                    order = np.concatenate([kept[:best], order[i - 1:last], kept[best:]])
+                    improved = True
+
+        order = order.tolist()
+        tour, cost = order_cost(matrix, groups, order)
+        if cost < best_cost - EPSILON:
+            best_cost = cost
+        else:
+            # a pass that didn't help is undone, so the cost returned is the order's
+            order = previous_order
+            improved = False
+
+    return order, best_cost, passes
+
+
+def improve_order(matrix, groups, order, progress=None, max_passes=MAX_PASSES, time_limit=TIME_LIMIT):
+    # iterated local search: the best order so far is cut in four and put back together in another
+    # order (a double bridge) to leave a local optimum, until the passes or the time run out
+    deadline = time.perf_counter() + time_limit
+    rng = np.random.default_rng(SEED)
+    best_order, best_cost, passes = local_search(matrix, groups, order, max_passes, deadline, progress)
+    while len(best_order) >= 8 and passes > 0 and time.perf_counter() < deadline:
+        a, b, c = np.sort(rng.choice(np.arange(1, len(best_order)), 3, replace=False))
+        kicked = best_order[:a] + best_order[b:c] + best_order[a:b] + best_order[c:]
+        order, cost, passes = local_search(matrix, groups, kicked, passes, deadline, progress)
+        if cost < best_cost - EPSILON:
+            best_order, best_cost = order, cost
+
+    return best_order
+
+
+def solve_tour(matrix, groups, progress=None):
+    if len(groups) <= HELD_KARP_LIMIT:
+        return held_karp(matrix, groups, progress)
+
+    order = improve_order(matrix, groups, nearest_neighbour_order(matrix, groups), progress)
+    return order_cost(matrix, groups, order)
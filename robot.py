@@ -1,6 +1,9 @@
+import numpy as np
 import pygame
+
+from assets import assets
+from planning.reservation import WAIT_STEPS
 from settings import *
-from timer import Timer
 
 ROBOT_COLORS = [
     pygame.Color(255, 0, 0),
@@ -15,11 +18,10 @@ ROBOT_COLORS = [
 class Robot(pygame.sprite.Sprite):
     robot_counter = 0
 
-    def __init__(self, pos, group, obstacle_sprites):
+    def __init__(self, pos, group, obstacles):
         super().__init__(group)
-        self.next_pos_index = 0
         self.pos_top_left = pos
-        self.image = pygame.image.load('graphics/robot_player.png').convert_alpha()
+        self.image = assets.load('graphics/robot_player.png')
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.copy().inflate(0, -26)
 
@@ -29,137 +31,47 @@ class Robot(pygame.sprite.Sprite):
         self.direction = pygame.math.Vector2()
         self.pos = pygame.math.Vector2(self.rect.center)
         self.speed = 200
+        # milliseconds spent on a waypoint that repeats the previous one, as long as the WAIT_STEPS
+        # one-tile moves the planners book for it
+        self.pause_time = WAIT_STEPS * TILE_SIZE / self.speed * 1000
 
-        self.obstacle_sprites = obstacle_sprites
-
-        self.path = []
-        self.collision_rects = []
-        self.path_timer = Timer(500)
+        # a SpatialHash of walls and tables, queried around the hitbox
+        self.obstacles = obstacles
 
-        self.can_move = False
-        self.pause_timer = Timer(1500)
-        self.paused_index = []
-        self.reset = False
+        # (steps, 2) int32 (x, y) cells still to visit
+        self.path = np.empty((0, 2), dtype=np.int32)
+        # (waypoints, 2) tile centres of the path, followed by the Fleet
+        self.waypoints = np.empty((0, 2))
 
     def update_position(self):
         self.rect.topleft = self.pos_top_left
         self.hitbox.topleft = self.pos_top_left
         self.pos = pygame.math.Vector2(self.rect.center)
         self.direction = pygame.math.Vector2()
-        self.can_move = False
-        self.next_pos_index = 0
-        self.paused_index = []
-        if self.reset:
-            self.reset = False
-            self.create_collision_rect()
 
     def set_path(self, path):
-        del path[0]
-        self.path = path
-        self.create_collision_rect()
-
-    def create_collision_rect(self):
-        if self.path:
-            self.collision_rects = []
-            for point in self.path:
-                x = (point.x * TILE_SIZE) + TILE_SIZE / 2
-                y = (point.y * TILE_SIZE) + TILE_SIZE / 2
-                rect = pygame.Rect((x - 2, y - 2), (4, 4))
-                self.collision_rects.append(rect)
-
-    def get_direction(self):
-        if self.collision_rects:
-            start = pygame.math.Vector2(self.pos)
-            end = pygame.math.Vector2(self.collision_rects[0].center)
-            if end - start:
-                self.direction = (end - start).normalize()
-        else:
-            self.direction = pygame.math.Vector2(0, 0)
-            self.next_pos_index = 0
-            self.paused_index = []
-            self.reset = True
-            self.path_timer.deactivate()
-
-    def check_collision(self):
-        if self.collision_rects:
-            for rect in self.collision_rects:
-                if rect.collidepoint(self.pos):
-                    del self.collision_rects[0]
-                    self.next_pos_index += 1
-                    self.get_direction()
-
-    def input(self):
-        keys = pygame.key.get_pressed()
-
-        if keys[pygame.K_UP]:
-            self.direction.y = -1
-        elif keys[pygame.K_DOWN]:
-            self.direction.y = 1
-        else:
-            self.direction.y = 0
-
-        if keys[pygame.K_RIGHT]:
-            self.direction.x = 1
-        elif keys[pygame.K_LEFT]:
-            self.direction.x = -1
-        else:
-            self.direction.x = 0
-
-        if keys[pygame.K_s] or self.path_timer.active:
-            self.get_direction()
-            self.path_timer.activate()
-            self.can_move = True
+        # path is an (N, 2) array of (x, y) cells starting with the one the robot stands on
+        self.path = np.asarray(path, dtype=np.int32).reshape(-1, 2)[1:]
+        self.waypoints = self.path * TILE_SIZE + TILE_SIZE / 2
 
-    def move(self, dt):
-        if self.pause_timer.active or not self.can_move:
-            return
-
-        if len(self.path) > 1:
-            if self.next_pos_index >= len(self.path) - 1:
-                self.next_pos_index = len(self.path) - 2
-
-            if self.next_pos_index == 0:
-                current_pos = pygame.math.Vector2((self.path[self.next_pos_index].x * TILE_SIZE),
-                                                  (self.path[self.next_pos_index].y * TILE_SIZE), )
-
-                next_pos = pygame.math.Vector2(
-                    (self.path[self.next_pos_index + 1].x * TILE_SIZE),
-                    (self.path[self.next_pos_index + 1].y * TILE_SIZE),
-                )
-            else:
-                current_pos = pygame.math.Vector2((self.path[self.next_pos_index - 1].x * TILE_SIZE),
-                                                  (self.path[self.next_pos_index - 1].y * TILE_SIZE), )
-
-                next_pos = pygame.math.Vector2(
-                    (self.path[self.next_pos_index].x * TILE_SIZE),
-                    (self.path[self.next_pos_index].y * TILE_SIZE),
-                )
-
-            if current_pos == next_pos and self.next_pos_index not in self.paused_index:
-                self.pause_timer.activate()
-                if self.next_pos_index == 0:
-                    self.paused_index.append(self.next_pos_index + 1)
-                    self.paused_index.append(self.next_pos_index)
-
-                else:
-                    self.paused_index.append(self.next_pos_index)
-                return
-
-        if self.direction.magnitude() != 0:
-            self.direction = self.direction.normalize()
+    def place(self, center):
+        self.pos.update(center[0], center[1])
+        self.hitbox.center = (round(self.pos.x), round(self.pos.y))
+        self.rect.center = self.hitbox.center
 
+    def drive(self, direction, dt):
+        self.direction = direction
         self.pos.x += self.direction.x * self.speed * dt
         self.hitbox.centerx = round(self.pos.x)
         self.collision('horizontal')
         self.pos.y += self.direction.y * self.speed * dt
         self.hitbox.centery = round(self.pos.y)
         self.collision("vertical")
-        self.check_collision()
         self.rect.center = self.hitbox.center
 
     def collision(self, direction):
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.obstacles.query(self.hitbox):
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.x > 0:
                         self.hitbox.right = sprite.hitbox.left
@@ -168,7 +80,7 @@ class Robot(pygame.sprite.Sprite):
                     self.rect.centerx = self.hitbox.centerx
                     self.pos.x = self.hitbox.centerx
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.obstacles.query(self.hitbox):
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.y > 0:
                         self.hitbox.bottom = sprite.hitbox.top
@@ -176,9 +88,3 @@ class Robot(pygame.sprite.Sprite):
                         self.hitbox.top = sprite.hitbox.bottom
                     self.rect.centery = self.hitbox.centery
                     self.pos.y = self.hitbox.centery
-
-    def update(self, dt, grid, start_coords, end_coords):
-        self.path_timer.update()
-        self.pause_timer.update()
-        self.input()
-        self.move(dt)
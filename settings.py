@@ -9,6 +9,25 @@ TILE_COLOR = (160, 160, 160)
 BUTTON_BG_COLOR = '#33323d'
 BUTTON_LINE_COLOR = '#f5f1de'
 ANIMATION_SPEED = 8
+# side in pixels of the cached map pieces the Layout camera draws walls and tables from
+RENDER_CHUNK_SIZE = TILE_SIZE * 16
+# side in cells of the tile id arrays the Editor stores its map in, see tilemap.TileMap
+TILE_CHUNK_SIZE = 32
+# the Layout camera draws zoom in steps of 1 / ZOOM_STEPS, so tiles and chunks scale to whole pixels
+ZOOM_STEPS = 32
+# pixels of scaled map pieces and robots the Layout camera keeps cached, least recently used go first;
+# the path overlay gets a cache of the same size
+ZOOM_CACHE_PIXELS = 16 * 1024 * 1024
+# frames at one zoom level before the map is redrawn with smoothscale, None to never smooth
+SMOOTH_ZOOM_IDLE_FRAMES = 30
+# 'pathfinding' or 'native' (planning.GridEngine) for the BFS/Dijkstra/A* modes
+PLANNING_BACKEND = 'pathfinding'
+# worker processes for the ManytoMany modes, None for one per core and 1 to plan serially
+PLANNING_WORKERS = None
+
+# 'json' writes saves as readable .txt files, 'binary' as compact .map files (see mapfile.py);
+# both are listed and loaded by the editor
+SAVE_FORMAT = 'json'
 
 EDITOR_DATA = {
     2: {'style': 'terrain', 'type': 'tile', 'menu': 'wall', 'menu_surf': 'graphics/wall.png',
@@ -0,0 +1,33 @@
+from settings import *
+
+
+class SpatialHash:
+    # Sprites bucketed by the TILE_SIZE cells their hitboxes overlap, so a collision check only
+    # looks at the few cells around a hitbox. Queries keep the order sprites were added in.
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+
+    def cell_keys(self, rect):
+        for x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                yield x, y
+
+    def add(self, sprite):
+        self.order[sprite] = len(self.order)
+        for key in self.cell_keys(sprite.hitbox):
+            self.cells.setdefault(key, []).append(sprite)
+
+    def remove(self, sprite):
+        for key in self.cell_keys(sprite.hitbox):
+            if sprite in self.cells.get(key, ()):
+                self.cells[key].remove(sprite)
+        self.order.pop(sprite, None)
+
+    def query(self, rect):
+        found = {sprite for key in self.cell_keys(rect) for sprite in self.cells.get(key, ())}
+        return sorted(found, key=self.order.get)
+
+    def __len__(self):
+        return len(self.order)
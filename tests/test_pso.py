@@ -0,0 +1,36 @@
+import numpy as np
+
+from planning.planner import plan_pso
+from planning.pso import GridIndex, Swarm
+
+
+def swarm_iterations(progress_events):
+    # the last iteration reported for every swarm, in the order the swarms ran
+    iterations = []
+    for stage, values in progress_events:
+        if stage != 'pso':
+            continue
+        if values['iteration'] == 1:
+            iterations.append(0)
+        iterations[-1] = values['iteration']
+    return iterations
+
+
+def test_swarm_stops_once_its_best_stalls():
+    np.random.seed(7)
+    grid = np.ones((6, 6), dtype=int)
+    swarm = Swarm((0, 0), GridIndex(grid, [(1, 1)]), 4, 50)
+    events = []
+    swarm.run(50, patience=2, progress=lambda stage, **values: events.append((stage, values)))
+    assert swarm_iterations(events)[0] < 50
+
+
+def test_plan_pso_stops_early_with_default_patience():
+    # the GUI runs PSO with max_iterations=5, the default patience must fit inside that
+    np.random.seed(7)
+    grid = [[1] * 6 for _ in range(6)]
+    grid[2][2] = 0
+    events = []
+    path = plan_pso(grid, (0, 0), [(2, 2)], progress=lambda stage, **values: events.append((stage, values)))
+    assert len(path)
+    assert min(swarm_iterations(events)) < 5
@@ -0,0 +1,127 @@
+import numpy as np
+
+from settings import *
+
+
+class TileMap:
+    # The Editor's tiles by (col, row) cell, kept as TILE_CHUNK_SIZE square uint8 arrays of tile ids
+    # (0 where a cell is empty). A chunk is created when a cell in it is first painted and dropped
+    # once it is empty again. The number of painted cells and their bounds are kept as tiles come
+    # and go; the bounds are only worked out from the chunks again after an edge cell is cleared.
+    def __init__(self):
+        self.chunks = {}
+        self.count = 0
+        # (left, top, right, bottom) cells, inclusive, None while empty
+        self.bounds = None
+        self.bounds_stale = False
+
+    def locate(self, cell):
+        # chunk key and the (row, col) inside the chunk
+        return (cell[0] // TILE_CHUNK_SIZE, cell[1] // TILE_CHUNK_SIZE), \
+            (cell[1] % TILE_CHUNK_SIZE, cell[0] % TILE_CHUNK_SIZE)
+
+    def get(self, cell):
+        key, index = self.locate(cell)
+        chunk = self.chunks.get(key)
+        return 0 if chunk is None else int(chunk[index])
+
+    def __contains__(self, cell):
+        return self.get(cell) != 0
+
+    def __len__(self):
+        return self.count
+
+    def set(self, cell, tile_id):
+        key, index = self.locate(cell)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not tile_id:
+                return
+            chunk = self.chunks[key] = np.zeros((TILE_CHUNK_SIZE, TILE_CHUNK_SIZE), dtype=np.uint8)
+
+        previous = chunk[index]
+        chunk[index] = tile_id
+        if tile_id and not previous:
+            self.count += 1
+            if not self.bounds_stale:
+                self.bounds = (cell[0], cell[1], cell[0], cell[1]) if self.bounds is None else (
+                    min(self.bounds[0], cell[0]), min(self.bounds[1], cell[1]),
+                    max(self.bounds[2], cell[0]), max(self.bounds[3], cell[1]))
+        elif previous and not tile_id:
+            self.count -= 1
+            if not chunk.any():
+                del self.chunks[key]
+            if self.bounds and (cell[0] in (self.bounds[0], self.bounds[2]) or cell[1] in (self.bounds[1], self.bounds[3])):
+                self.bounds_stale = True
+
+    def remove(self, cell, tile_id):
+        # clears the cell if it holds tile_id
+        if self.get(cell) == tile_id:
+            self.set(cell, 0)
+
+    def paste(self, tile_ids, left=0, top=0):
+        # writes a (rows, cols) array of tile ids with its top left corner on cell (left, top)
+        rows, cols = tile_ids.shape
+        for chunk_x in range(left // TILE_CHUNK_SIZE, (left + cols - 1) // TILE_CHUNK_SIZE + 1):
+            for chunk_y in range(top // TILE_CHUNK_SIZE, (top + rows - 1) // TILE_CHUNK_SIZE + 1):
+                x0, y0 = chunk_x * TILE_CHUNK_SIZE, chunk_y * TILE_CHUNK_SIZE
+                x1, x2 = max(left, x0), min(left + cols, x0 + TILE_CHUNK_SIZE)
+                y1, y2 = max(top, y0), min(top + rows, y0 + TILE_CHUNK_SIZE)
+                block = tile_ids[y1 - top:y2 - top, x1 - left:x2 - left]
+
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    if not block.any():
+                        continue
+                    chunk = self.chunks[(chunk_x, chunk_y)] = np.zeros((TILE_CHUNK_SIZE, TILE_CHUNK_SIZE),
+                                                                      dtype=np.uint8)
+                self.count -= np.count_nonzero(chunk)
+                chunk[y1 - y0:y2 - y0, x1 - x0:x2 - x0] = block
+                self.count += np.count_nonzero(chunk)
+                if not chunk.any():
+                    del self.chunks[(chunk_x, chunk_y)]
+        self.bounds_stale = True
+
+    def clear(self):
+        self.chunks.clear()
+        self.count = 0
+        self.bounds = None
+        self.bounds_stale = False
+
+    def get_bounds(self):
+        if self.bounds_stale:
+            self.bounds = None
+            for (chunk_x, chunk_y), chunk in self.chunks.items():
+                rows = np.flatnonzero(chunk.any(axis=1))
+                cols = np.flatnonzero(chunk.any(axis=0))
+                x0, y0 = chunk_x * TILE_CHUNK_SIZE, chunk_y * TILE_CHUNK_SIZE
+                bounds = (x0 + int(cols[0]), y0 + int(rows[0]), x0 + int(cols[-1]), y0 + int(rows[-1]))
+                self.bounds = bounds if self.bounds is None else (
+                    min(self.bounds[0], bounds[0]), min(self.bounds[1], bounds[1]),
+                    max(self.bounds[2], bounds[2]), max(self.bounds[3], bounds[3]))
+            self.bounds_stale = False
+        return self.bounds
+
+    def query(self, left, top, right, bottom):
+        # (col, row, tile_id) of every painted cell from (left, top) to (right, bottom), inclusive
+        for chunk_x in range(left // TILE_CHUNK_SIZE, right // TILE_CHUNK_SIZE + 1):
+            for chunk_y in range(top // TILE_CHUNK_SIZE, bottom // TILE_CHUNK_SIZE + 1):
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+                x0, y0 = chunk_x * TILE_CHUNK_SIZE, chunk_y * TILE_CHUNK_SIZE
+                x1, y1 = max(left, x0) - x0, max(top, y0) - y0
+                block = chunk[y1:min(bottom + 1, y0 + TILE_CHUNK_SIZE) - y0, x1:min(right + 1, x0 + TILE_CHUNK_SIZE) - x0]
+                for row, col in zip(*np.nonzero(block)):
+                    yield x0 + x1 + int(col), y0 + y1 + int(row), int(block[row, col])
+
+    def to_array(self, left, top, right, bottom):
+        # (rows, cols) tile ids from (left, top) to (right, bottom), inclusive
+        tile_ids = np.zeros((bottom - top + 1, right - left + 1), dtype=np.uint8)
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            x0, y0 = chunk_x * TILE_CHUNK_SIZE, chunk_y * TILE_CHUNK_SIZE
+            x1, x2 = max(left, x0), min(right + 1, x0 + TILE_CHUNK_SIZE)
+            y1, y2 = max(top, y0), min(bottom + 1, y0 + TILE_CHUNK_SIZE)
+            if x1 < x2 and y1 < y2:
+                tile_ids[y1 - top:y2 - top, x1 - left:x2 - left] = chunk[y1 - y0:y2 - y0, x1 - x0:x2 - x0]
+        return tile_ids